@@ -56,7 +56,7 @@ def write_article(data: dict) -> str:
 
 
 if __name__ == "__main__":
-    memory = read_memory(FOLDER_ID)
+    memory = read_memory(FOLDER_ID, keys=["topic", "key_points", "sources"])
 
     if memory:
         article = write_article(memory)
@@ -0,0 +1,279 @@
+"""
+In-memory Box stand-in for load testing Box Agentic Mesh.
+
+Implements the subset of the Box SDK client, folder and file objects that the
+mesh layers use, with a configurable per-call latency so load runs behave
+like talking to the real service without needing credentials or touching a
+real account. Every API call is counted so runs can compare how much Box
+traffic a workload generates.
+
+Usage:
+    box = FakeBox(latency_ms=50, jitter_ms=20)
+    box.install()  # route all mesh modules to the fake client
+    write_memory("load-0", {...})  # folders are created on first use
+"""
+
+import importlib
+import itertools
+import random
+import threading
+import time
+from collections import Counter
+
+MESH_MODULES = (
+    "box_agentic_mesh.memory",
+    "box_agentic_mesh.index",
+    "box_agentic_mesh.ledger",
+    "box_agentic_mesh.shadow",
+)
+"""Modules whose `get_box_client` is replaced by `FakeBox.install`."""
+
+
+class FakeBox:
+    """Shared state and latency model for the fake Box service."""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.calls = Counter()
+        self.bytes_uploaded = 0
+        self.bytes_downloaded = 0
+        self._random = random.Random(seed)
+        self._ids = itertools.count(1000)
+        self._lock = threading.RLock()
+        self._items: dict[str, dict] = {}
+        self.root_id = self._add("folder", "All Files", None)
+
+    def client(self) -> "FakeClient":
+        """Return a client bound to this fake service."""
+        return FakeClient(self)
+
+    def install(self) -> None:
+        """Point every mesh module's `get_box_client` at this fake."""
+        for name in MESH_MODULES:
+            module = importlib.import_module(name)
+            module.get_box_client = self.client
+
+    def create_file(self, folder_id: str, name: str, content: bytes) -> str:
+        """Seed a file directly, without latency or call accounting."""
+        self._ensure_folder(folder_id)
+        return self._add("file", name, folder_id, content)
+
+    def stats(self) -> dict:
+        """Return Box call counts and transfer volume for the run."""
+        return {
+            "calls": dict(sorted(self.calls.items())),
+            "total_calls": sum(self.calls.values()),
+            "bytes_uploaded": self.bytes_uploaded,
+            "bytes_downloaded": self.bytes_downloaded,
+        }
+
+    def _call(self, name: str) -> None:
+        with self._lock:
+            self.calls[name] += 1
+            delay = self.latency_ms + self._random.uniform(0, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def _add(self, item_type, name, parent_id, content=None) -> str:
+        with self._lock:
+            item_id = str(next(self._ids))
+            self._items[item_id] = {
+                "type": item_type,
+                "name": name,
+                "parent": parent_id,
+                "content": content,
+            }
+            return item_id
+
+    def _ensure_folder(self, folder_id: str) -> None:
+        with self._lock:
+            if folder_id not in self._items:
+                self._items[folder_id] = {
+                    "type": "folder",
+                    "name": folder_id,
+                    "parent": self.root_id,
+                    "content": None,
+                }
+
+    def _get(self, item_id: str) -> dict:
+        with self._lock:
+            record = self._items.get(item_id)
+        if record is None:
+            raise FakeBoxError(404, f"Item {item_id} not found")
+        return record
+
+    def _children(self, folder_id: str) -> list[tuple[str, dict]]:
+        with self._lock:
+            return [
+                (item_id, record)
+                for item_id, record in self._items.items()
+                if record["parent"] == folder_id
+            ]
+
+
+class FakeBoxError(Exception):
+    """Error raised by the fake service, mirroring `BoxAPIException.status`."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class FakeClient:
+    """Stand-in for `boxsdk.Client`."""
+
+    def __init__(self, box: FakeBox):
+        self._box = box
+        self.session = FakeSession(box)
+
+    def folder(self, folder_id: str) -> "FakeFolder":
+        self._box._ensure_folder(folder_id)
+        return FakeFolder(self._box, folder_id)
+
+    def file(self, file_id: str) -> "FakeFile":
+        return FakeFile(self._box, file_id)
+
+
+class FakeSession:
+    """Stand-in for `boxsdk.session.Session`, serving streamed file downloads."""
+
+    def __init__(self, box: FakeBox):
+        self._box = box
+
+    def get(self, url: str, stream: bool = False, **kwargs) -> "FakeResponse":
+        self._box._call("file.content")
+        file_id = url.split("/")[-2]
+        return FakeResponse(self._box, self._box._get(file_id)["content"])
+
+
+class FakeResponse:
+    """Streamed download; only the chunks actually read count as downloaded."""
+
+    def __init__(self, box: FakeBox, content: bytes):
+        self._box = box
+        self._content = content
+        self.network_response = self
+        self.response_as_stream = self
+
+    def stream(self, amt: int = 65536, decode_content=None):
+        for start in range(0, len(self._content), amt):
+            chunk = self._content[start : start + amt]
+            with self._box._lock:
+                self._box.bytes_downloaded += len(chunk)
+            yield chunk
+
+    def close(self) -> None:
+        pass
+
+
+class FakeItem:
+    """Common behaviour of fake files and folders."""
+
+    type = None
+
+    def __init__(self, box: FakeBox, item_id: str):
+        self._box = box
+        self.id = item_id
+        self._name = None
+
+    @property
+    def name(self) -> str:
+        # Like SDK objects, keep the name once seen, even after deletion
+        if self._name is None:
+            self._name = self._box._get(self.id)["name"]
+        return self._name
+
+    def get_url(self, *endpoints) -> str:
+        return "/".join(("fake:", f"{self.type}s", self.id, *endpoints))
+
+    def get(self, fields=None):
+        self._box._call(f"{self.type}.get")
+        self._box._get(self.id)
+        return self
+
+    def delete(self) -> bool:
+        self._box._call(f"{self.type}.delete")
+        box = self._box
+        with box._lock:
+            box._get(self.id)
+            doomed = [self.id]
+            while doomed:
+                item_id = doomed.pop()
+                doomed.extend(i for i, _ in box._children(item_id))
+                box._items.pop(item_id, None)
+        return True
+
+
+class FakeFolder(FakeItem):
+    """Stand-in for `boxsdk.object.folder.Folder`."""
+
+    type = "folder"
+
+    def get_items(self, limit=None, offset=0, fields=None, **kwargs):
+        self._box._call("folder.get_items")
+        self._box._get(self.id)
+        items = [
+            (
+                FakeFolder(self._box, item_id)
+                if record["type"] == "folder"
+                else FakeFile(self._box, item_id)
+            )
+            for item_id, record in self._box._children(self.id)
+        ]
+        return iter(items[offset:])
+
+    def create_subfolder(self, name: str) -> "FakeFolder":
+        self._box._call("folder.create_subfolder")
+        self._check_name(name)
+        return FakeFolder(self._box, self._box._add("folder", name, self.id))
+
+    def upload_stream(self, file_stream, file_name: str, **kwargs) -> "FakeFile":
+        self._box._call("folder.upload_stream")
+        self._check_name(file_name)
+        content = file_stream.read()
+        with self._box._lock:
+            self._box.bytes_uploaded += len(content)
+        return FakeFile(self._box, self._box._add("file", file_name, self.id, content))
+
+    def _check_name(self, name: str) -> None:
+        if any(record["name"] == name for _, record in self._box._children(self.id)):
+            raise FakeBoxError(409, f"Item with the same name already exists: {name}")
+
+
+class FakeFile(FakeItem):
+    """Stand-in for `boxsdk.object.file.File`."""
+
+    type = "file"
+
+    @property
+    def size(self) -> int:
+        return len(self._box._get(self.id)["content"])
+
+    def content(self) -> bytes:
+        self._box._call("file.content")
+        content = self._box._get(self.id)["content"]
+        with self._box._lock:
+            self._box.bytes_downloaded += len(content)
+        return content
+
+    def download_to(self, writeable_stream, **kwargs) -> None:
+        writeable_stream.write(self.content())
+
+    def update_contents_with_stream(self, file_stream, **kwargs) -> "FakeFile":
+        self._box._call("file.update_contents_with_stream")
+        content = file_stream.read()
+        with self._box._lock:
+            self._box._get(self.id)["content"] = content
+            self._box.bytes_uploaded += len(content)
+        return self
+
+    def copy(self, parent_folder, name: str | None = None, **kwargs) -> "FakeFile":
+        self._box._call("file.copy")
+        record = self._box._get(self.id)
+        target = FakeFolder(self._box, parent_folder.id)
+        target._check_name(name or record["name"])
+        new_id = self._box._add(
+            "file", name or record["name"], parent_folder.id, record["content"]
+        )
+        return FakeFile(self._box, new_id)
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Load Test Harness for Box Agentic Mesh.
+
+Simulates a fleet of agent pairs doing research -> writing hand-offs and
+drives them concurrently against the mesh. Each hand-off cycle mirrors the
+demo agents: the research agent writes memory and logs to the ledger, the
+writing agent reads memory and logs its own action, and a configurable share
+of cycles also stage and commit a Shadow Box.
+
+Targets:
+    - api: the FastAPI app, in-process (no network, fake Box)
+    - mcp: the MCP tools, in-process (fake Box)
+    - http: a running API server at --url
+
+In-process targets use the `FakeBox` stand-in from `fake_box.py`, with
+latency set by --latency-ms/--jitter-ms. To load test over HTTP without real
+Box credentials, start a server backed by the fake with --serve.
+
+The report is printed (or written to --output) as JSON with sorted keys, so
+two runs can be diffed directly. It contains throughput, error rates and
+p50/p95/p99 latency per endpoint, plus Box call counts for fake-backed runs.
+
+Runs use a temporary `MESH_STATE_DIR`, removed on exit, so the synthetic
+hand-offs and index entries never reach a real deployment's state.
+
+Usage:
+    PYTHONPATH=src python loadtest/run_load.py --target api --agents 500
+    PYTHONPATH=src python loadtest/run_load.py --target mcp --latency-ms 50
+    PYTHONPATH=src python loadtest/run_load.py --serve --port 8000
+    PYTHONPATH=src python loadtest/run_load.py --target http --url http://localhost:8000
+"""
+
+import atexit
+import shutil
+import sys
+import os
+import tempfile
+
+# Add src directory to path for imports
+sys.path.insert(0, "src")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Keep synthetic hand-offs, index entries and jobs out of the real mesh state.
+# Must be set before any box_agentic_mesh module reads its config.
+os.environ["MESH_STATE_DIR"] = tempfile.mkdtemp(prefix="mesh-loadtest-")
+atexit.register(shutil.rmtree, os.environ["MESH_STATE_DIR"], ignore_errors=True)
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+from fake_box import FakeBox
+
+
+class Recorder:
+    """Collects per-endpoint latencies and outcomes."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.handoffs = 0
+
+    def record(self, endpoint: str, seconds: float, ok: bool) -> None:
+        self.samples[endpoint].append(seconds)
+        if not ok:
+            self.errors[endpoint] += 1
+
+    def report(self, duration: float) -> dict:
+        endpoints = {}
+        for endpoint, samples in sorted(self.samples.items()):
+            ordered = sorted(samples)
+            endpoints[endpoint] = {
+                "count": len(ordered),
+                "errors": self.errors[endpoint],
+                "error_rate": self.errors[endpoint] / len(ordered),
+                "mean_ms": sum(ordered) / len(ordered) * 1000,
+                "p50_ms": percentile(ordered, 50) * 1000,
+                "p95_ms": percentile(ordered, 95) * 1000,
+                "p99_ms": percentile(ordered, 99) * 1000,
+                "max_ms": ordered[-1] * 1000,
+            }
+        requests = sum(e["count"] for e in endpoints.values())
+        errors = sum(e["errors"] for e in endpoints.values())
+        return {
+            "duration_s": duration,
+            "requests": requests,
+            "errors": errors,
+            "error_rate": errors / requests if requests else 0.0,
+            "throughput_rps": requests / duration if duration else 0.0,
+            "handoffs_completed": self.handoffs,
+            "endpoints": endpoints,
+        }
+
+
+def percentile(ordered: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+class HttpDriver:
+    """Issues hand-off operations through the REST API."""
+
+    def __init__(self, client, recorder: Recorder):
+        self.client = client
+        self.recorder = recorder
+
+    async def _request(self, method: str, label: str, url: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            ok = response.status_code < 400
+        except Exception:
+            ok = False
+        self.recorder.record(f"{method} {label}", time.perf_counter() - start, ok)
+
+    async def write_memory(self, folder_id: str, data: dict) -> None:
+        await self._request(
+            "POST", "/memory/{folder_id}", f"/memory/{folder_id}", json={"data": data}
+        )
+
+    async def read_memory(self, folder_id: str, keys: list[str] | None) -> None:
+        params = {"keys": ",".join(keys)} if keys else None
+        await self._request(
+            "GET", "/memory/{folder_id}", f"/memory/{folder_id}", params=params
+        )
+
+    async def log_action(self, folder_id: str, action: str, **fields) -> None:
+        body = {"folder_id": folder_id, "action": action, **fields}
+        await self._request("POST", "/ledger/log", "/ledger/log", json=body)
+
+    async def shadow_cycle(self, folder_id: str) -> None:
+        await self._request(
+            "POST",
+            "/shadow/create/{folder_id}",
+            f"/shadow/create/{folder_id}",
+            json={},
+        )
+        await self._request(
+            "POST", "/shadow/commit/{folder_id}", f"/shadow/commit/{folder_id}"
+        )
+
+
+class McpDriver:
+    """Issues hand-off operations through the MCP tools."""
+
+    def __init__(self, server, recorder: Recorder):
+        self.server = server
+        self.recorder = recorder
+
+    async def _call(self, tool: str, arguments: dict) -> None:
+        start = time.perf_counter()
+        try:
+            await self.server.call_tool(tool, arguments)
+            ok = True
+        except Exception:
+            ok = False
+        self.recorder.record(f"mcp:{tool}", time.perf_counter() - start, ok)
+
+    async def write_memory(self, folder_id: str, data: dict) -> None:
+        await self._call("hand_off_task", {"folder_id": folder_id, "task_data": data})
+
+    async def read_memory(self, folder_id: str, keys: list[str] | None) -> None:
+        arguments = {"folder_id": folder_id}
+        if keys:
+            arguments["keys"] = keys
+        await self._call("read_agent_memory", arguments)
+
+    async def log_action(self, folder_id: str, action: str, **fields) -> None:
+        await self._call(
+            "log_agent_action", {"folder_id": folder_id, "action": action, **fields}
+        )
+
+    async def shadow_cycle(self, folder_id: str) -> None:
+        await self._call("create_shadow_staging", {"folder_id": folder_id})
+        await self._call("commit_shadow_changes", {"folder_id": folder_id})
+
+
+def research_payload(agent: int, cycle: int, payload_kb: int) -> dict:
+    """Build a research memory document of roughly `payload_kb` KiB."""
+    filler = "Persistent memory enables agent handoffs. " * (payload_kb * 24)
+    return {
+        "task_id": f"load-{agent}-{cycle}",
+        "topic": f"Load topic {agent % 17}",
+        "key_points": [filler[: payload_kb * 1024]],
+        "sources": ["Box API Documentation", "MCP Protocol Specification"],
+        "hand_off_to": "Writing Agent",
+        "timestamp": time.time(),
+    }
+
+
+async def agent_pair(driver, args, agent: int, recorder: Recorder) -> None:
+    """Run one research/writing agent pair through its hand-off cycles."""
+    rng = random.Random(args.seed + agent)
+    folder_id = f"load-{agent % args.folders}"
+    think = args.think_ms / 1000
+    for cycle in range(args.handoffs):
+        await driver.write_memory(
+            folder_id, research_payload(agent, cycle, args.payload_kb)
+        )
+        await driver.log_action(
+            folder_id,
+            "research_completed",
+            prompt="Research the assigned topic and summarise key points.",
+            model="GPT-4",
+            reasoning="Completed research for load test",
+        )
+        if think:
+            await asyncio.sleep(think)
+        await driver.read_memory(folder_id, args.read_keys)
+        await driver.log_action(
+            folder_id,
+            "article_written",
+            model="Claude",
+            reasoning="Generated article from research memory",
+        )
+        if rng.random() < args.shadow_rate:
+            await driver.shadow_cycle(folder_id)
+        recorder.handoffs += 1
+
+
+async def run(args) -> dict:
+    """Execute the configured workload and return the JSON report."""
+    recorder = Recorder()
+    box = None
+    client = None
+    if args.target in ("api", "mcp"):
+        box = FakeBox(args.latency_ms, args.jitter_ms, seed=args.seed)
+        box.install()
+    if args.target == "mcp":
+        from box_agentic_mesh.mcp_server import app as mcp_app
+
+        driver = McpDriver(mcp_app, recorder)
+    else:
+        import httpx
+
+        if args.target == "api":
+            from box_agentic_mesh.api import app as api_app
+
+            transport = httpx.ASGITransport(app=api_app)
+            client = httpx.AsyncClient(transport=transport, base_url="http://mesh")
+        else:
+            client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+        driver = HttpDriver(client, recorder)
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(
+            *(agent_pair(driver, args, agent, recorder) for agent in range(args.agents))
+        )
+    finally:
+        if client:
+            await client.aclose()
+    duration = time.perf_counter() - start
+
+    report = recorder.report(duration)
+    report["target"] = args.target
+    report["config"] = {
+        key: getattr(args, key)
+        for key in (
+            "agents",
+            "handoffs",
+            "folders",
+            "payload_kb",
+            "read_keys",
+            "shadow_rate",
+            "think_ms",
+            "latency_ms",
+            "jitter_ms",
+            "seed",
+        )
+    }
+    if box:
+        report["box"] = box.stats()
+    return report
+
+
+def serve(args) -> None:
+    """Run the REST API backed by the fake Box for HTTP load tests."""
+    import uvicorn
+
+    FakeBox(args.latency_ms, args.jitter_ms, seed=args.seed).install()
+    from box_agentic_mesh.api import app as api_app
+
+    uvicorn.run(api_app, host="127.0.0.1", port=args.port)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--target", choices=("api", "mcp", "http"), default="api")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--agents", type=int, default=50, help="agent pairs")
+    parser.add_argument("--handoffs", type=int, default=5, help="cycles per pair")
+    parser.add_argument("--folders", type=int, default=25, help="shared folders")
+    parser.add_argument("--payload-kb", type=int, default=4)
+    parser.add_argument(
+        "--read-keys",
+        type=lambda value: [key for key in value.split(",") if key],
+        help="comma-separated keys the writing agent reads (default: all)",
+    )
+    parser.add_argument("--shadow-rate", type=float, default=0.05)
+    parser.add_argument("--think-ms", type=float, default=0.0)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--serve", action="store_true", help="serve the fake API")
+    parser.add_argument("--port", type=int, default=8000)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.serve:
+        serve(args)
+    else:
+        report = json.dumps(asyncio.run(run(args)), indent=2, sort_keys=True)
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(report + "\n")
+        else:
+            print(report)
@@ -6,8 +6,14 @@ safe file staging, and audit logging capabilities within Box.
 
 Modules:
     - memory: Agentic Memory layer for persistent state
+    - blobs: Content-addressed storage for large payloads
+    - jsonstream: Incremental JSON parsing for key-projected reads
+    - index: Cross-folder memory search index
     - shadow: Shadow Box layer for safe file staging
     - ledger: Reasoning Ledger layer for audit trails
+    - handoff: Hand-off work queue with leased claims
+    - jobs: Background jobs for long-running shadow operations
+    - clients: Per-request credentials and tenant client cache
     - api: FastAPI REST endpoints
     - mcp_server: Model Context Protocol server integration
 """
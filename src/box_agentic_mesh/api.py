@@ -4,20 +4,88 @@ FastAPI REST API for Box Agentic Mesh.
 Provides REST endpoints for all three layers:
     - /memory/*: Agentic Memory operations
     - /shadow/*: Shadow Box staging operations
-    - /ledger/*: Reasoning Ledger logging operations
+    - /ledger/*: Reasoning Ledger logging and analytics
+    - /handoff/*: Hand-off queue with leased claims
+    - /jobs/*: Background job status and control
+
+Requests may send their own Box credential as `Authorization: Bearer
+<access token>`; they then run as that tenant with its cached client and
+rate limit (see `clients.py`). Requests without one use the server's
+configured token.
 
 Run with: python -m src.box_agentic_mesh.api
 
 Access documentation at: http://localhost:8000/docs
 """
 
-from fastapi import FastAPI, HTTPException
+import json
+import math
+from contextlib import asynccontextmanager
+from boxsdk.exception import BoxAPIException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from .memory import read_memory, write_memory
+from .clients import RateLimitError, resolve_credential, activate
+from .memory import read_memory, write_memory, flush_memory, stream_memory
 from .shadow import create_shadow, commit_shadow
-from .ledger import log_action
+from .ledger import log_action, ledger_stats, read_ledger, export_ledger
+from .index import search_memory
+from .handoff import (
+    HandOffNotFoundError,
+    LeaseError,
+    enqueue_hand_off,
+    claim_hand_off,
+    ack_hand_off,
+    nack_hand_off,
+    hand_off_depth,
+)
+from .jobs import (
+    JobConflictError,
+    JobNotFoundError,
+    claim_folder,
+    submit_job,
+    get_job,
+    cancel_job,
+    resume_job,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Upload coalesced memory writes before the server stops."""
+    yield
+    await run_in_threadpool(flush_memory)
+
+
+app = FastAPI(title="Box Agentic Mesh API", lifespan=lifespan)
+
 
-app = FastAPI(title="Box Agentic Mesh API")
+@app.middleware("http")
+async def tenant_credentials(request: Request, call_next):
+    """Run the request with the caller's Box credential, if it sent one.
+
+    Returns 401 if Box rejects the credential and 429 if the tenant is over
+    its rate limit.
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    token = token.strip()
+    if scheme.lower() != "bearer" or not token:
+        return await call_next(request)
+    try:
+        session = await run_in_threadpool(resolve_credential, token)
+    except BoxAPIException as e:
+        status_code = 401 if e.status == 401 else 502
+        return JSONResponse(status_code=status_code, content={"detail": e.message})
+    try:
+        with activate(session):
+            return await call_next(request)
+    except RateLimitError as e:
+        return JSONResponse(
+            status_code=429,
+            content={"detail": str(e)},
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
 
 
 class MemoryData(BaseModel):
@@ -42,24 +110,82 @@ class LedgerLogRequest(BaseModel):
     reasoning: str | None = None
 
 
+class HandOffEnqueueRequest(BaseModel):
+    """Request body for queueing a hand-off."""
+
+    folder_id: str
+    agent: str
+    payload: dict | None = None
+
+
+class HandOffClaimRequest(BaseModel):
+    """Request body for claiming a hand-off."""
+
+    agent: str
+    lease_seconds: float | None = None
+
+
+class HandOffReceipt(BaseModel):
+    """Request body for acknowledging or releasing a claimed hand-off."""
+
+    receipt: str
+
+
+@app.get("/memory/search")
+async def get_memory_search(request: Request, q: str | None = None, limit: int = 50):
+    """Search agent memory across folders using the local index.
+
+    `q` matches words in string values; any other query parameter is an
+    exact-match filter on an indexed key, e.g.
+    `/memory/search?hand_off_to=Writing Agent`.
+    """
+    filters = {
+        key: value
+        for key, value in request.query_params.items()
+        if key not in ("q", "limit")
+    }
+    try:
+        return {"results": search_memory(q, filters, limit)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @app.get("/memory/{folder_id}")
-async def get_memory(folder_id: str):
+async def get_memory(
+    folder_id: str, resolve_blobs: bool = True, keys: str | None = None
+):
     """Get agent memory from a Box folder.
 
-    Returns the contents of `.agent_memory.json` as JSON.
+    Returns the contents of `.agent_memory.json` as JSON, streamed from Box
+    as it downloads. With `?resolve_blobs=false`, large values are returned
+    as blob references; a blob that cannot be found is returned as its
+    reference either way. With `?keys=task_id,draft.outline`, only those keys
+    (dots select nested keys) are parsed out of the download, which stops
+    once they have been found.
     """
     try:
-        data = read_memory(folder_id)
-        return {"memory": data}
+        if keys:
+            key_paths = [key.strip() for key in keys.split(",") if key.strip()]
+            return {"memory": read_memory(folder_id, resolve_blobs, key_paths)}
+        chunks = stream_memory(folder_id, resolve_blobs)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return StreamingResponse(_memory_envelope(chunks), media_type="application/json")
+
+
+def _memory_envelope(chunks):
+    yield b'{"memory": '
+    yield from chunks
+    yield b"}"
 
 
 @app.post("/memory/{folder_id}")
 async def post_memory(folder_id: str, memory_data: MemoryData):
     """Write agent memory to a Box folder.
 
-    Creates or updates `.agent_memory.json` in the specified folder.
+    Creates or updates `.agent_memory.json` in the specified folder. With
+    write coalescing enabled, the upload happens when the folder's window
+    ends; reads through this server see the new memory immediately.
     """
     try:
         write_memory(folder_id, memory_data.data)
@@ -69,27 +195,45 @@ async def post_memory(folder_id: str, memory_data: MemoryData):
 
 
 @app.post("/shadow/create/{folder_id}")
-async def post_create_shadow(folder_id: str, request: ShadowCreateRequest):
+async def post_create_shadow(
+    folder_id: str, request: ShadowCreateRequest, background: bool = False
+):
     """Create a Shadow Box staging subfolder.
 
     Creates `[SHADOW]` subfolder and copies specified files (or all files).
+    With `?background=true` the copy runs as a job and 202 is returned with
+    the job status; poll it at `/jobs/{job_id}`. Returns 409 while the folder
+    has an active job.
     """
+    if background:
+        return _start_job("shadow_create", folder_id, request.file_ids)
     try:
-        shadow_id = create_shadow(folder_id, request.file_ids)
+        with claim_folder(folder_id):
+            shadow_id = create_shadow(folder_id, request.file_ids)
         return {"shadow_folder_id": shadow_id}
+    except JobConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/shadow/commit/{folder_id}")
-async def post_commit_shadow(folder_id: str):
+async def post_commit_shadow(folder_id: str, background: bool = False):
     """Commit changes from Shadow Box to production.
 
     Copies staged files back to the main folder and deletes the shadow.
+    With `?background=true` the commit runs as a job and 202 is returned with
+    the job status; poll it at `/jobs/{job_id}`. Returns 409 while the folder
+    has an active job.
     """
+    if background:
+        return _start_job("shadow_commit", folder_id)
     try:
-        commit_shadow(folder_id, approval=True)
+        with claim_folder(folder_id):
+            commit_shadow(folder_id, approval=True)
         return {"status": "committed"}
+    except JobConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -111,3 +255,160 @@ async def post_log(request: LedgerLogRequest):
         return {"status": "logged"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/ledger/stats")
+async def get_ledger_stats(
+    folder_ids: str, since: str | None = None, until: str | None = None
+):
+    """Get ledger activity across folders from their rollups.
+
+    `folder_ids` is a comma-separated list; `since` and `until` are optional
+    hours such as `2026-01-14T10`. Returns counts and byte sizes by hour,
+    action, model and folder.
+    """
+    try:
+        ids = [folder_id for folder_id in folder_ids.split(",") if folder_id]
+        return {"stats": ledger_stats(ids, since, until)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/ledger/{folder_id}")
+async def get_ledger(
+    folder_id: str, limit: int | None = None, resolve_blobs: bool = True
+):
+    """Get reasoning ledger entries from a Box folder.
+
+    Returns entries oldest first, optionally only the newest `limit`.
+    Deduplicated prompts and reasoning are returned as text unless
+    `?resolve_blobs=false`.
+    """
+    try:
+        return {"entries": read_ledger(folder_id, limit, resolve_blobs)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/ledger/{folder_id}/export")
+async def get_ledger_export(folder_id: str):
+    """Export the full reasoning ledger as newline-delimited JSON.
+
+    Deduplicated prompts and reasoning are resolved back to text before the
+    response starts; text whose blob cannot be found is exported as its
+    reference.
+    """
+    try:
+        entries = export_ledger(folder_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return StreamingResponse(
+        (json.dumps(entry) + "\n" for entry in entries),
+        media_type="application/x-ndjson",
+    )
+
+
+@app.post("/handoff/enqueue")
+async def post_enqueue_hand_off(request: HandOffEnqueueRequest):
+    """Queue a hand-off of a folder to an agent type.
+
+    Re-queueing a folder whose earlier hand-off is still waiting updates
+    that message instead of adding another.
+    """
+    try:
+        message = enqueue_hand_off(request.folder_id, request.agent, request.payload)
+        return {"message": message}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/handoff/claim")
+async def post_claim_hand_off(request: HandOffClaimRequest):
+    """Claim the oldest waiting hand-off for an agent type.
+
+    The message is leased for `lease_seconds`; ack it with its `receipt`
+    before the lease expires. Returns `{"message": null}` if none is waiting.
+    """
+    try:
+        return {"message": claim_hand_off(request.agent, request.lease_seconds)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/handoff/{message_id}/ack")
+async def post_ack_hand_off(message_id: str, request: HandOffReceipt):
+    """Complete a claimed hand-off and remove it from the queue."""
+    try:
+        ack_hand_off(message_id, request.receipt)
+        return {"status": "acked"}
+    except HandOffNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except LeaseError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@app.post("/handoff/{message_id}/nack")
+async def post_nack_hand_off(message_id: str, request: HandOffReceipt):
+    """Release a claimed hand-off so another agent can claim it."""
+    try:
+        nack_hand_off(message_id, request.receipt)
+        return {"status": "released"}
+    except HandOffNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except LeaseError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@app.get("/handoff")
+async def get_hand_off_depth():
+    """Get the number of waiting and leased hand-offs per agent type."""
+    return {"queues": hand_off_depth()}
+
+
+def _start_job(kind: str, folder_id: str, file_ids: list[str] | None = None):
+    """Submit a background job and return its status with 202 Accepted."""
+    try:
+        job = submit_job(kind, folder_id, file_ids)
+    except JobConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return JSONResponse(status_code=202, content={"job": job.to_dict()})
+
+
+@app.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """Get the status and progress of a background job.
+
+    Reports files and bytes done, totals, and an ETA while running.
+    """
+    try:
+        return {"job": get_job(job_id).to_dict()}
+    except JobNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@app.post("/jobs/{job_id}/cancel")
+async def post_cancel_job(job_id: str):
+    """Cancel a background job.
+
+    Running jobs stop after the file currently being copied.
+    """
+    try:
+        return {"job": cancel_job(job_id).to_dict()}
+    except JobNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@app.post("/jobs/{job_id}/resume")
+async def post_resume_job(job_id: str):
+    """Resume a failed, cancelled or interrupted job from its checkpoint."""
+    try:
+        job = resume_job(job_id)
+    except JobNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except JobConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JSONResponse(status_code=202, content={"job": job.to_dict()})
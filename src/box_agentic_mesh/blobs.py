@@ -0,0 +1,176 @@
+"""
+Content-Addressed Blob Store.
+
+Stores large payloads as separate files in a hidden `.agent_blobs` subfolder
+of a Box folder, named by the SHA-256 hash of their content. Documents keep a
+small reference in place of the payload, so they stay cheap to download, and
+a payload that is written again unchanged is never re-uploaded because a blob
+with its hash already exists.
+
+Blobs are immutable: the same hash always names the same bytes, so the set of
+hashes known to exist in each folder is cached in-process. A blob whose file
+turns out to be gone (404) is dropped from the cache, so the next write of
+that content uploads it again.
+
+Reference Format:
+    {"$blob": "sha256:9f86d081884c7d65...", "size": 5242880}
+
+Usage:
+    ref = blob_ref(data)
+    store_blobs(client, "folder_id", {ref["$blob"]: data})
+    data = load_blob(client, "folder_id", ref)
+"""
+
+import hashlib
+import io
+import threading
+
+BLOB_FOLDER_NAME = ".agent_blobs"
+"""Name of the subfolder holding blobs inside a Box folder."""
+
+_lock = threading.Lock()
+_blob_folders: dict[str, str] = {}
+_known_blobs: dict[str, dict[str, str]] = {}
+
+
+def blob_ref(data: bytes) -> dict:
+    """Return the reference that stands in for a payload."""
+    return {"$blob": "sha256:" + hashlib.sha256(data).hexdigest(), "size": len(data)}
+
+
+def is_blob_ref(value) -> bool:
+    """Check whether a value is a blob reference."""
+    return isinstance(value, dict) and set(value) == {"$blob", "size"}
+
+
+def _file_name(digest: str) -> str:
+    return digest.replace(":", "-")
+
+
+def _get_blob_folder(client, folder_id: str, create: bool):
+    """Find (or create) the blob subfolder and cache the hashes it holds."""
+    with _lock:
+        blob_folder_id = _blob_folders.get(folder_id)
+    if blob_folder_id:
+        return client.folder(blob_folder_id)
+
+    folder = client.folder(folder_id)
+    blob_folder = None
+    for item in folder.get_items():
+        if item.name == BLOB_FOLDER_NAME and item.type == "folder":
+            blob_folder = item
+            break
+    known = {}
+    if blob_folder:
+        for item in blob_folder.get_items():
+            if item.type == "file":
+                known[item.name] = item.id
+    elif create:
+        blob_folder = folder.create_subfolder(BLOB_FOLDER_NAME)
+    else:
+        return None
+
+    with _lock:
+        _blob_folders[folder_id] = blob_folder.id
+        # The listing replaces the cache, dropping blobs deleted in Box
+        _known_blobs[folder_id] = known
+    return blob_folder
+
+
+def store_blobs(client, folder_id: str, blobs: dict[str, bytes]) -> int:
+    """Upload payloads that the folder does not already hold.
+
+    Args:
+        client: Authenticated Box client.
+        folder_id: The Box folder ID the blobs belong to.
+        blobs: Mapping of blob hash (as in the reference) to payload bytes.
+
+    Returns:
+        The number of blobs actually uploaded.
+    """
+    if not blobs:
+        return 0
+    with _lock:
+        known = dict(_known_blobs.get(folder_id, {}))
+    missing = {d: data for d, data in blobs.items() if _file_name(d) not in known}
+    if not missing:
+        return 0
+
+    blob_folder = _get_blob_folder(client, folder_id, create=True)
+    with _lock:
+        known = _known_blobs.setdefault(folder_id, {})
+        missing = {d: data for d, data in missing.items() if _file_name(d) not in known}
+    uploaded_count = 0
+    for digest, data in missing.items():
+        name = _file_name(digest)
+        try:
+            uploaded = blob_folder.upload_stream(io.BytesIO(data), name)
+        except Exception as e:
+            # 409: another writer stored the same content first
+            if getattr(e, "status", None) == 409:
+                continue
+            raise
+        with _lock:
+            _known_blobs[folder_id][name] = uploaded.id
+        uploaded_count += 1
+    return uploaded_count
+
+
+def load_blob(client, folder_id: str, ref: dict, download=None):
+    """Download the payload behind a blob reference.
+
+    Args:
+        client: Authenticated Box client.
+        folder_id: The Box folder ID the blob belongs to.
+        ref: The blob reference.
+        download: Optional `download(client, file_id)` to fetch the file with
+                  instead of reading its whole content, e.g. to stream it.
+
+    Returns:
+        The payload bytes, or whatever `download` returns.
+
+    Raises:
+        KeyError: If the folder holds no blob with the referenced hash.
+    """
+    file_id = blob_file_id(client, folder_id, ref)
+    try:
+        if download:
+            return download(client, file_id)
+        return client.file(file_id).content()
+    except Exception as e:
+        if getattr(e, "status", None) != 404:
+            raise
+        forget_blob(folder_id, ref)
+        raise KeyError(f"Blob {ref['$blob']} not found in folder {folder_id}") from e
+
+
+def forget_blob(folder_id: str, ref: dict) -> None:
+    """Drop a blob that is no longer in Box from the cache.
+
+    The blob folder is listed again before the next upload, so the content
+    is re-uploaded (into a new blob folder if that was deleted too).
+    """
+    with _lock:
+        _known_blobs.get(folder_id, {}).pop(_file_name(ref["$blob"]), None)
+        _blob_folders.pop(folder_id, None)
+
+
+def blob_file_id(client, folder_id: str, ref: dict) -> str:
+    """Return the Box file ID holding a blob, for callers that stream it.
+
+    Raises:
+        KeyError: If the folder holds no blob with the referenced hash.
+    """
+    name = _file_name(ref["$blob"])
+    with _lock:
+        file_id = _known_blobs.get(folder_id, {}).get(name)
+    if not file_id:
+        # Another process may have written it since the folder was listed
+        with _lock:
+            _blob_folders.pop(folder_id, None)
+        _get_blob_folder(client, folder_id, create=False)
+        with _lock:
+            file_id = _known_blobs.get(folder_id, {}).get(name)
+    if not file_id:
+        raise KeyError(f"Blob {ref['$blob']} not found in folder {folder_id}")
+    return file_id
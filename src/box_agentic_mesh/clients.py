@@ -0,0 +1,204 @@
+"""
+Per-Request Credentials.
+
+Lets one deployment serve many Box users or enterprises. API and MCP requests
+may carry their own Box access token; it is mapped to an authenticated
+client kept in an LRU cache with a time-to-live, so a tenant's requests
+reuse one client (and its pooled HTTP connections) instead of
+authenticating on every call. Each tenant also gets a token-bucket rate
+limit, so one busy tenant cannot starve the others.
+
+Each token is looked up once, when first seen, to find its Box user and
+enterprise. Rate limits apply per tenant: the Box enterprise, or the user for
+users outside an enterprise. Visibility of shared mesh state (the memory
+index, hand-off queue, background jobs and coalesced writes) is scoped to the
+user, its owner, so colleagues in one enterprise cannot see each other's
+folders through the mesh.
+
+Cached sessions are not re-validated until they expire, so a token revoked
+in Box keeps working here for up to `MESH_CLIENT_TTL_SECONDS`.
+
+Requests without a credential use the deployment's own `BOX_ACCESS_TOKEN`
+and belong to no tenant or owner.
+
+Usage:
+    session = resolve_credential(token)  # cached; authenticates on a miss
+    with activate(session):              # raises RateLimitError when throttled
+        read_memory("folder_id")         # uses the tenant's client
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from boxsdk import Client, OAuth2
+from .config import (
+    BOX_CLIENT_ID,
+    BOX_CLIENT_SECRET,
+    MESH_CLIENT_CACHE_SIZE,
+    MESH_CLIENT_TTL_SECONDS,
+    MESH_TENANT_RATE,
+    MESH_TENANT_BURST,
+)
+
+
+class RateLimitError(Exception):
+    """Raised when a tenant has used up its request budget."""
+
+    def __init__(self, tenant_id: str, retry_after: float):
+        super().__init__(f"Rate limit exceeded for tenant {tenant_id}.")
+        self.tenant_id = tenant_id
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Token-bucket rate limiter."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """Take one token.
+
+        Returns:
+            0 if a token was taken, otherwise the seconds until one is free.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+
+class TenantSession:
+    """An authenticated client, its Box user and the tenant it belongs to."""
+
+    def __init__(self, client: Client, tenant_id: str, owner_id: str | None = None):
+        self.client = client
+        self.tenant_id = tenant_id
+        self.owner_id = owner_id or tenant_id
+        self.created_at = time.monotonic()
+
+
+class ClientCache:
+    """LRU cache of tenant sessions with a time-to-live, keyed by token hash."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._sessions: OrderedDict[str, TenantSession] = OrderedDict()
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> TenantSession:
+        """Return the session for a token, authenticating on a miss."""
+        key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        with self._lock:
+            session = self._sessions.get(key)
+            if session and time.monotonic() - session.created_at < self.ttl:
+                self._sessions.move_to_end(key)
+                return session
+        session = _authenticate(token)
+        with self._lock:
+            self._sessions[key] = session
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self.maxsize:
+                self._sessions.popitem(last=False)
+        return session
+
+    def bucket(self, tenant_id: str) -> TokenBucket:
+        """Return the rate-limit bucket of a tenant."""
+        with self._lock:
+            bucket = self._buckets.get(tenant_id)
+            if bucket is None:
+                bucket = TokenBucket(MESH_TENANT_RATE, MESH_TENANT_BURST)
+                self._buckets[tenant_id] = bucket
+            self._buckets.move_to_end(tenant_id)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+            return bucket
+
+
+def _authenticate(token: str) -> TenantSession:
+    """Build a client for a token and look up its tenant."""
+    oauth = OAuth2(
+        client_id=BOX_CLIENT_ID,
+        client_secret=BOX_CLIENT_SECRET,
+        access_token=token,
+    )
+    client = Client(oauth)
+    user = client.user().get(fields=["id", "enterprise"])
+    owner_id = f"user:{user.id}"
+    enterprise = getattr(user, "enterprise", None)
+    if enterprise:
+        tenant_id = f"enterprise:{enterprise['id']}"
+    else:
+        tenant_id = owner_id
+    return TenantSession(client, tenant_id, owner_id)
+
+
+_cache = ClientCache(MESH_CLIENT_CACHE_SIZE, MESH_CLIENT_TTL_SECONDS)
+_current: ContextVar[TenantSession | None] = ContextVar("tenant_session", default=None)
+
+
+def resolve_credential(token: str) -> TenantSession:
+    """Map a Box access token to a cached, authenticated tenant session.
+
+    A cached session is reused until `MESH_CLIENT_TTL_SECONDS` after it was
+    created, even if the token has since been revoked.
+
+    Raises:
+        BoxAPIException: If the token is rejected by Box.
+    """
+    return _cache.get(token)
+
+
+@contextmanager
+def activate(session: TenantSession):
+    """Run the enclosed mesh calls as the session's tenant.
+
+    Charges one request to the tenant's rate limit.
+
+    Raises:
+        RateLimitError: If the tenant has no request budget left.
+    """
+    retry_after = _cache.bucket(session.tenant_id).try_acquire()
+    if retry_after:
+        raise RateLimitError(session.tenant_id, retry_after)
+    reset = _current.set(session)
+    try:
+        yield session
+    finally:
+        _current.reset(reset)
+
+
+def get_request_client() -> Client | None:
+    """Return the current tenant's client, or None outside a tenant request."""
+    session = _current.get()
+    return session.client if session else None
+
+
+def current_tenant() -> str | None:
+    """Return the current tenant ID, or None outside a tenant request."""
+    session = _current.get()
+    return session.tenant_id if session else None
+
+
+def current_owner() -> str | None:
+    """Return the current Box user ID, or None outside a tenant request.
+
+    Scopes what a request can see of shared mesh state.
+    """
+    session = _current.get()
+    return session.owner_id if session else None
@@ -85,3 +85,52 @@ def get_box_client() -> Client:
         )
 
     return Client(oauth)
+
+
+# Mesh runtime settings
+
+MESH_STATE_DIR = os.getenv("MESH_STATE_DIR", ".mesh_state")
+"""Local directory for mesh bookkeeping (job checkpoints, caches, indexes)."""
+
+MESH_JOB_WORKERS = int(os.getenv("MESH_JOB_WORKERS", "4"))
+"""Maximum number of background jobs that run concurrently."""
+
+MEMORY_BLOB_THRESHOLD = int(os.getenv("MEMORY_BLOB_THRESHOLD", "65536"))
+"""Memory values whose JSON encoding exceeds this many bytes are stored as
+content-addressed blobs instead of inline. Set to 0 to disable offloading."""
+
+MEMORY_INDEX_KEYS = tuple(
+    key.strip()
+    for key in os.getenv("MEMORY_INDEX_KEYS", "task_id,hand_off_to,topic").split(",")
+    if key.strip()
+)
+"""Memory keys with exact-match search indexes."""
+
+MEMORY_INDEX_SYNC_SECONDS = float(os.getenv("MEMORY_INDEX_SYNC_SECONDS", "30"))
+"""Minimum seconds between Box event syncs of the memory index, started in
+the background by a search. Set to 0 to only sync when `sync_memory_index`
+is called."""
+
+MEMORY_COALESCE_WINDOW = float(os.getenv("MEMORY_COALESCE_WINDOW", "0"))
+"""Seconds over which writes to the same folder's memory are merged into one
+upload. Set to 0 to write every call through to Box immediately."""
+
+HANDOFF_LEASE_SECONDS = float(os.getenv("HANDOFF_LEASE_SECONDS", "300"))
+"""Default visibility timeout for claimed hand-offs."""
+
+LEDGER_BLOB_THRESHOLD = int(os.getenv("LEDGER_BLOB_THRESHOLD", "1024"))
+"""Ledger prompts and reasoning longer than this many bytes are stored once
+per folder as content-addressed blobs. Set to 0 to keep all text inline."""
+
+MESH_CLIENT_CACHE_SIZE = int(os.getenv("MESH_CLIENT_CACHE_SIZE", "256"))
+"""Maximum number of per-tenant authenticated clients kept in memory."""
+
+MESH_CLIENT_TTL_SECONDS = float(os.getenv("MESH_CLIENT_TTL_SECONDS", "3000"))
+"""How long a cached tenant client is reused before re-authenticating. A
+token revoked in Box keeps working for up to this long."""
+
+MESH_TENANT_RATE = float(os.getenv("MESH_TENANT_RATE", "20"))
+"""Sustained requests per second allowed for each tenant."""
+
+MESH_TENANT_BURST = float(os.getenv("MESH_TENANT_BURST", "40"))
+"""Requests a tenant may burst above its sustained rate."""
@@ -0,0 +1,360 @@
+"""
+Hand-off Queue Layer.
+
+Gives each target agent type a work queue of pending hand-offs, so agents
+claim work instead of polling folder memory. A claim leases the message for a
+visibility timeout: while the lease holds, no other agent can claim it, and
+only the holder's receipt can acknowledge it. If the holder crashes or the
+lease expires, the message becomes claimable again; a late ack with the old
+receipt is rejected, so each hand-off is completed by exactly one agent.
+
+Queueing the same folder for the same agent again while the earlier message
+is still waiting refreshes that message instead of adding a duplicate.
+
+Queues are per Box user (see `clients.py`): agents only claim, ack and
+count hand-offs queued with the same user's credential, so work handed off
+inside an enterprise is not visible to colleagues without access to it.
+
+Claims, acks and nacks are O(1) (amortised with lease expiry). The queue is
+journaled to `<MESH_STATE_DIR>/handoff_queue.log` and shared by every mesh
+process using that directory (see `journal.py`): each operation locks the
+journal and catches up on other processes' changes first, so a hand-off
+queued through the MCP server can be claimed through the REST API. The
+journal is compacted as it grows.
+
+Message Format:
+    {
+        "message_id": "9b1e...",
+        "folder_id": "12345",
+        "agent": "Writing Agent",
+        "owner": "user:67890",         # null without per-request credentials
+        "payload": {"task_id": "research-001", "topic": "..."},
+        "enqueued_at": 1768386600.0,
+        "attempts": 1,
+        "receipt": "c4a7...",          # present while leased
+        "lease_expires": 1768386900.0  # present while leased
+    }
+
+Usage:
+    enqueue_hand_off("folder_id", "Writing Agent", {"task_id": "research-001"})
+    message = claim_hand_off("Writing Agent")
+    ...  # read memory from message["folder_id"] and do the work
+    ack_hand_off(message["message_id"], message["receipt"])
+"""
+
+import heapq
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from .config import MESH_STATE_DIR, HANDOFF_LEASE_SECONDS
+from .clients import current_owner
+from .journal import Journal
+
+
+class HandOffNotFoundError(Exception):
+    """Raised when a message ID is unknown or already acknowledged."""
+
+
+class LeaseError(Exception):
+    """Raised when a receipt does not match the message's current lease."""
+
+
+class HandOffQueue:
+    """Per-agent queues of hand-offs with leased claims."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._journal = Journal(path)
+        self._clear()
+
+    def enqueue(
+        self,
+        folder_id: str,
+        agent: str,
+        payload: dict | None = None,
+        owner: str | None = None,
+    ) -> dict:
+        """Queue a hand-off of a folder to an agent type."""
+        with self._locked():
+            message_id = self._waiting.get((owner, agent, folder_id))
+            if message_id:
+                message = self._messages[message_id]
+                message["payload"] = payload or {}
+                self._journal.append(
+                    {"op": "update", "id": message_id, "payload": message["payload"]}
+                )
+                return dict(message)
+            message = {
+                "message_id": uuid.uuid4().hex,
+                "folder_id": folder_id,
+                "agent": agent,
+                "owner": owner,
+                "payload": payload or {},
+                "enqueued_at": time.time(),
+                "attempts": 0,
+            }
+            self._apply_enqueue(message)
+            self._journal.append({"op": "enqueue", "message": message})
+            return dict(message)
+
+    def claim(
+        self, agent: str, lease_seconds: float | None = None, owner: str | None = None
+    ) -> dict | None:
+        """Lease the oldest waiting hand-off for an agent type.
+
+        Returns:
+            The message, including the `receipt` needed to ack or nack it,
+            or None if nothing is waiting.
+        """
+        lease_seconds = lease_seconds or HANDOFF_LEASE_SECONDS
+        with self._locked():
+            self._expire_leases()
+            ready = self._ready.get((owner, agent))
+            while ready:
+                message_id = ready.popleft()
+                message = self._messages.get(message_id)
+                if message and "receipt" not in message:
+                    break
+            else:
+                return None
+            receipt = uuid.uuid4().hex
+            expires = time.time() + lease_seconds
+            self._apply_claim(message_id, receipt, expires)
+            self._journal.append(
+                {
+                    "op": "claim",
+                    "id": message_id,
+                    "receipt": receipt,
+                    "expires": expires,
+                }
+            )
+            return dict(message)
+
+    def ack(self, message_id: str, receipt: str, owner: str | None = None) -> None:
+        """Mark a claimed hand-off as done and remove it from the queue."""
+        with self._locked():
+            self._check_lease(message_id, receipt, owner)
+            self._apply_ack(message_id)
+            self._journal.append({"op": "ack", "id": message_id})
+            self._maybe_compact()
+
+    def nack(self, message_id: str, receipt: str, owner: str | None = None) -> None:
+        """Give up a claim so the hand-off can be claimed again."""
+        with self._locked():
+            self._check_lease(message_id, receipt, owner)
+            self._apply_release(message_id)
+            self._journal.append({"op": "release", "id": message_id})
+
+    def depth(self, owner: str | None = None) -> dict[str, dict]:
+        """Count an owner's waiting and leased hand-offs per agent type."""
+        with self._locked():
+            self._expire_leases()
+            counts = {}
+            for message in self._messages.values():
+                if message.get("owner") != owner:
+                    continue
+                agent_counts = counts.setdefault(
+                    message["agent"], {"waiting": 0, "leased": 0}
+                )
+                agent_counts["leased" if "receipt" in message else "waiting"] += 1
+            return counts
+
+    def _check_lease(self, message_id: str, receipt: str, owner: str | None) -> None:
+        self._expire_leases()
+        message = self._messages.get(message_id)
+        if not message or message.get("owner") != owner:
+            raise HandOffNotFoundError(f"Hand-off {message_id} not found.")
+        if message.get("receipt") != receipt:
+            raise LeaseError(
+                f"Lease on hand-off {message_id} expired or is held by another agent."
+            )
+
+    def _expire_leases(self) -> None:
+        now = time.time()
+        while self._leases and self._leases[0][0] <= now:
+            _, message_id, receipt = heapq.heappop(self._leases)
+            message = self._messages.get(message_id)
+            if message and message.get("receipt") == receipt:
+                self._apply_release(message_id, front=True)
+
+    def _apply_enqueue(self, message: dict) -> None:
+        message_id = message["message_id"]
+        self._messages[message_id] = message
+        self._ready.setdefault(_queue_key(message), deque()).append(message_id)
+        self._waiting[(*_queue_key(message), message["folder_id"])] = message_id
+
+    def _apply_claim(self, message_id: str, receipt: str, expires: float) -> None:
+        message = self._messages[message_id]
+        message["receipt"] = receipt
+        message["lease_expires"] = expires
+        message["attempts"] += 1
+        key = (*_queue_key(message), message["folder_id"])
+        if self._waiting.get(key) == message_id:
+            del self._waiting[key]
+        heapq.heappush(self._leases, (expires, message_id, receipt))
+
+    def _apply_release(self, message_id: str, front: bool = False) -> None:
+        message = self._messages[message_id]
+        message.pop("receipt", None)
+        message.pop("lease_expires", None)
+        ready = self._ready.setdefault(_queue_key(message), deque())
+        if front:
+            ready.appendleft(message_id)
+        else:
+            ready.append(message_id)
+        # A newer hand-off of the same folder may already be waiting
+        self._waiting.setdefault(
+            (*_queue_key(message), message["folder_id"]), message_id
+        )
+
+    def _apply_ack(self, message_id: str) -> None:
+        message = self._messages.pop(message_id)
+        key = (*_queue_key(message), message["folder_id"])
+        if self._waiting.get(key) == message_id:
+            del self._waiting[key]
+
+    @contextmanager
+    def _locked(self):
+        """Lock the queue and apply other processes' changes first."""
+        with self._journal.locked() as (reset, ops):
+            if reset:
+                self._clear()
+            for op in ops:
+                self._apply(op)
+            if reset:
+                self._drop_stale_ready()
+            yield
+
+    def _clear(self) -> None:
+        self._messages: dict[str, dict] = {}
+        self._ready: dict[tuple, deque] = {}
+        self._waiting: dict[tuple, str] = {}
+        self._leases: list[tuple[float, str, str]] = []
+
+    def _apply(self, op: dict) -> None:
+        if op["op"] == "enqueue":
+            self._apply_enqueue(op["message"])
+        elif op["id"] not in self._messages:
+            return
+        elif op["op"] == "update":
+            self._messages[op["id"]]["payload"] = op["payload"]
+        elif op["op"] == "claim":
+            self._apply_claim(op["id"], op["receipt"], op["expires"])
+        elif op["op"] == "release":
+            self._apply_release(op["id"])
+        elif op["op"] == "ack":
+            self._apply_ack(op["id"])
+
+    def _drop_stale_ready(self) -> None:
+        # Claimed or released messages may be listed more than once
+        for key, ready in self._ready.items():
+            seen = set()
+            kept = deque()
+            for message_id in ready:
+                message = self._messages.get(message_id)
+                if message and "receipt" not in message and message_id not in seen:
+                    seen.add(message_id)
+                    kept.append(message_id)
+            self._ready[key] = kept
+
+    def _maybe_compact(self) -> None:
+        """Rewrite the journal once it is mostly acknowledged history."""
+        if self._journal.ops < 1000 or self._journal.ops < 4 * len(self._messages):
+            return
+        self._drop_stale_ready()
+        ops = []
+        # Waiting messages in claim order, then leased ones with their lease
+        for ready in self._ready.values():
+            for message_id in ready:
+                ops.append({"op": "enqueue", "message": self._messages[message_id]})
+        for message in self._messages.values():
+            if "receipt" not in message:
+                continue
+            waiting = {
+                k: v
+                for k, v in message.items()
+                if k not in ("receipt", "lease_expires")
+            }
+            waiting["attempts"] -= 1
+            ops.append({"op": "enqueue", "message": waiting})
+            ops.append(
+                {
+                    "op": "claim",
+                    "id": message["message_id"],
+                    "receipt": message["receipt"],
+                    "expires": message["lease_expires"],
+                }
+            )
+        self._journal.rewrite(ops)
+
+
+def _queue_key(message: dict) -> tuple:
+    return (message.get("owner"), message["agent"])
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_hand_off_queue() -> HandOffQueue:
+    """Return the process-wide hand-off queue, loading it on first use."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = HandOffQueue(os.path.join(MESH_STATE_DIR, "handoff_queue.log"))
+        return _queue
+
+
+def enqueue_hand_off(folder_id: str, agent: str, payload: dict | None = None) -> dict:
+    """Queue a hand-off of a folder to an agent type.
+
+    Args:
+        folder_id: Box folder ID holding the task's memory.
+        agent: Target agent type, e.g. "Writing Agent".
+        payload: Optional small summary of the task (e.g. `task_id`, `topic`).
+
+    Returns:
+        The queued message.
+    """
+    return get_hand_off_queue().enqueue(folder_id, agent, payload, current_owner())
+
+
+def claim_hand_off(agent: str, lease_seconds: float | None = None) -> dict | None:
+    """Claim the oldest waiting hand-off for an agent type.
+
+    Args:
+        agent: Agent type claiming work, e.g. "Writing Agent".
+        lease_seconds: Visibility timeout; defaults to `HANDOFF_LEASE_SECONDS`.
+
+    Returns:
+        The leased message with its `receipt`, or None if nothing is waiting.
+    """
+    return get_hand_off_queue().claim(agent, lease_seconds, current_owner())
+
+
+def ack_hand_off(message_id: str, receipt: str) -> None:
+    """Complete a claimed hand-off.
+
+    Raises:
+        HandOffNotFoundError: If the message is unknown or already acked.
+        LeaseError: If the lease expired or the receipt is not current.
+    """
+    get_hand_off_queue().ack(message_id, receipt, current_owner())
+
+
+def nack_hand_off(message_id: str, receipt: str) -> None:
+    """Release a claimed hand-off so another agent can claim it.
+
+    Raises:
+        HandOffNotFoundError: If the message is unknown or already acked.
+        LeaseError: If the lease expired or the receipt is not current.
+    """
+    get_hand_off_queue().nack(message_id, receipt, current_owner())
+
+
+def hand_off_depth() -> dict[str, dict]:
+    """Count waiting and leased hand-offs per agent type."""
+    return get_hand_off_queue().depth(current_owner())
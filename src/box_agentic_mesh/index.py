@@ -0,0 +1,445 @@
+"""
+Memory Search Index.
+
+Keeps a local, incrementally maintained index over the agent memory of every
+folder the mesh has written to (or seen in the Box event stream), so
+questions like "which folders have a hand-off pending to Writing Agent" are a
+single lookup instead of a read of every folder's `.agent_memory.json`.
+
+Two kinds of index are kept:
+    - exact-match indexes on the keys in `MEMORY_INDEX_KEYS`
+      (by default `task_id`, `hand_off_to` and `topic`)
+    - an inverted index over the words in every inline string value
+      (values offloaded to blobs are not full-text indexed)
+
+The index is persisted as a snapshot, `<MESH_STATE_DIR>/memory_index.json`,
+plus an append-only journal, `memory_index.log`, so an update writes one line
+rather than the whole index. The journal is shared by every mesh process
+using that directory (see `journal.py`): each operation catches up on the
+other processes' updates first, and the journal is folded into the snapshot
+under its lock as it grows. Only the per-folder documents are stored;
+postings are rebuilt on load.
+
+Searches also start a background catch-up on memory changed outside the mesh
+from the Box event stream, at most every `MEMORY_INDEX_SYNC_SECONDS` per
+user, so such changes show up in searches after the next sync. Events for
+content the index already holds are skipped without downloading it.
+
+Documents are kept per Box user (their owner, see `clients.py`) and folder:
+every user who writes or syncs a shared folder gets their own entry for it,
+searches only see the current user's entries, and one user's trash event
+only removes that user's entry.
+
+Usage:
+    update_memory_index("folder_id", {"hand_off_to": "Writing Agent", ...})
+    search_memory(filters={"hand_off_to": "Writing Agent"})
+    search_memory(query="agentic mesh benefits")
+    sync_memory_index()  # catch up from Box change events now
+"""
+
+import contextvars
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from boxsdk import Client, OAuth2
+from .config import (
+    BOX_CLIENT_ID,
+    BOX_CLIENT_SECRET,
+    BOX_ACCESS_TOKEN,
+    MESH_STATE_DIR,
+    MEMORY_INDEX_KEYS,
+    MEMORY_INDEX_SYNC_SECONDS,
+)
+from .blobs import is_blob_ref
+from .clients import get_request_client, current_owner
+from .journal import Journal
+
+MEMORY_FILE_NAME = ".agent_memory.json"
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def get_box_client() -> Client:
+    """Create and return an authenticated Box client.
+
+    Inside a request that carried its own Box credential, returns that
+    tenant's cached client (see `clients.py`).
+
+    Returns:
+        Authenticated Box SDK Client instance.
+
+    Raises:
+        ValueError: If BOX_ACCESS_TOKEN is not configured.
+    """
+    client = get_request_client()
+    if client:
+        return client
+    if BOX_ACCESS_TOKEN:
+        oauth = OAuth2(
+            client_id=BOX_CLIENT_ID,
+            client_secret=BOX_CLIENT_SECRET,
+            access_token=BOX_ACCESS_TOKEN,
+        )
+    else:
+        raise ValueError("BOX_ACCESS_TOKEN required. Configure in .env file.")
+    return Client(oauth)
+
+
+def tokenize(text: str) -> set[str]:
+    """Split text into lowercase search terms."""
+    return {token.lower() for token in _TOKEN_RE.findall(text)}
+
+
+def _strings(value):
+    """Yield every string nested inside a memory value."""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        if not is_blob_ref(value):
+            for item in value.values():
+                yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+class MemoryIndex:
+    """Exact-match and full-text index over memory documents."""
+
+    def __init__(self, path: str, keys: tuple[str, ...]):
+        self.path = path
+        self.journal_path = os.path.splitext(path)[0] + ".log"
+        self.keys = keys
+        self._journal = Journal(self.journal_path)
+        self._loaded = False
+        self._clear()
+
+    def update(
+        self,
+        folder_id: str,
+        data: dict,
+        owner: str | None = None,
+        sha1: str | None = None,
+    ) -> None:
+        """Index (or re-index) a folder's memory document.
+
+        Args:
+            folder_id: Folder holding the memory.
+            data: The memory document, with blob references left in place.
+            owner: Box user the document is indexed for.
+            sha1: SHA-1 of the uploaded `.agent_memory.json`, used to skip
+                  Box events for content that is already indexed.
+        """
+        fields = {
+            key: str(data[key])
+            for key in self.keys
+            if key in data and data[key] is not None
+        }
+        terms = set()
+        for text in _strings(data):
+            terms |= tokenize(text)
+        doc = {
+            "owner": owner,
+            "fields": fields,
+            "terms": sorted(terms),
+            "sha1": sha1,
+            "updated_at": time.time(),
+        }
+        with self._locked():
+            self._apply_update(folder_id, doc)
+            self._log({"op": "update", "id": folder_id, "doc": doc})
+
+    def remove(self, folder_id: str, owner: str | None = None) -> None:
+        """Drop a folder from an owner's view of the index."""
+        with self._locked():
+            if (owner, folder_id) in self._docs:
+                self._apply_remove(folder_id, owner)
+                self._log({"op": "remove", "id": folder_id, "owner": owner})
+
+    def is_current(
+        self, folder_id: str, sha1: str | None, owner: str | None = None
+    ) -> bool:
+        """Check whether a folder is indexed for an owner at a content hash."""
+        with self._locked():
+            doc = self._docs.get((owner, folder_id))
+            return bool(sha1 and doc and doc.get("sha1") == sha1)
+
+    def get_stream_position(self, owner: str | None = None):
+        """Return how far an owner's Box event stream has been consumed."""
+        with self._locked():
+            return self.stream_positions.get(owner or "")
+
+    def search(
+        self,
+        query: str | None = None,
+        filters: dict | None = None,
+        limit: int = 50,
+        owner: str | None = None,
+    ) -> list[dict]:
+        """Find folders whose memory matches every filter and query term.
+
+        Args:
+            query: Words that must all appear in the memory's string values.
+            filters: Exact values for indexed keys, e.g. {"hand_off_to": "..."}.
+            limit: Maximum number of results, most recently updated first.
+            owner: Only return folders indexed for this owner.
+
+        Raises:
+            ValueError: If a filter names a key that is not indexed.
+        """
+        filters = filters or {}
+        for key in filters:
+            if key not in self._exact:
+                raise ValueError(
+                    f"'{key}' is not indexed. Indexed keys: {', '.join(self.keys)}"
+                )
+        with self._locked():
+            candidates = None
+            postings = [
+                self._exact[key].get(str(value), set())
+                for key, value in filters.items()
+            ]
+            postings += [self._terms.get(term, set()) for term in tokenize(query or "")]
+            for posting in sorted(postings, key=len):
+                candidates = (
+                    posting.copy() if candidates is None else candidates & posting
+                )
+                if not candidates:
+                    break
+            if candidates is None:
+                candidates = set(self._docs)
+            results = [
+                {
+                    "folder_id": doc_key[1],
+                    "fields": self._docs[doc_key]["fields"],
+                    "updated_at": self._docs[doc_key]["updated_at"],
+                }
+                for doc_key in candidates
+                if doc_key[0] == owner
+            ]
+        results.sort(key=lambda result: result["updated_at"], reverse=True)
+        return results[:limit]
+
+    def set_stream_position(self, stream_position, owner: str | None = None) -> None:
+        """Remember how far an owner's Box event stream has been consumed."""
+        with self._locked():
+            self.stream_positions[owner or ""] = stream_position
+            self._log(
+                {"op": "position", "owner": owner or "", "position": stream_position}
+            )
+
+    def _post(self, doc_key: tuple, doc: dict) -> None:
+        for key, value in doc["fields"].items():
+            if key in self._exact:
+                self._exact[key].setdefault(value, set()).add(doc_key)
+        for term in doc["terms"]:
+            self._terms.setdefault(term, set()).add(doc_key)
+
+    def _unpost(self, doc_key: tuple) -> None:
+        doc = self._docs.get(doc_key)
+        if not doc:
+            return
+        for key, value in doc["fields"].items():
+            posting = self._exact.get(key, {}).get(value)
+            if posting is not None:
+                posting.discard(doc_key)
+                if not posting:
+                    del self._exact[key][value]
+        for term in doc["terms"]:
+            posting = self._terms.get(term)
+            if posting is not None:
+                posting.discard(doc_key)
+                if not posting:
+                    del self._terms[term]
+
+    def _apply_update(self, folder_id: str, doc: dict) -> None:
+        # Keys may have been reconfigured since the document was written
+        doc["fields"] = {k: v for k, v in doc["fields"].items() if k in self.keys}
+        # Users sharing a folder each keep their own entry for it
+        doc_key = (doc.get("owner"), folder_id)
+        self._unpost(doc_key)
+        self._docs[doc_key] = doc
+        self._post(doc_key, doc)
+
+    def _apply_remove(self, folder_id: str, owner: str | None) -> None:
+        doc_key = (owner, folder_id)
+        if doc_key in self._docs:
+            self._unpost(doc_key)
+            del self._docs[doc_key]
+
+    @contextmanager
+    def _locked(self):
+        """Lock the index and apply other processes' updates first."""
+        with self._journal.locked() as (reset, ops):
+            if reset or not self._loaded:
+                self._load_snapshot()
+            for op in ops:
+                if op["op"] == "update":
+                    self._apply_update(op["id"], op["doc"])
+                elif op["op"] == "remove":
+                    self._apply_remove(op["id"], op.get("owner"))
+                elif op["op"] == "position":
+                    self.stream_positions[op["owner"]] = op["position"]
+            yield
+
+    def _clear(self) -> None:
+        self.stream_positions: dict[str, str] = {}
+        self._docs: dict[tuple, dict] = {}
+        self._exact: dict[str, dict[str, set[tuple]]] = {key: {} for key in self.keys}
+        self._terms: dict[str, set[tuple]] = {}
+
+    def _load_snapshot(self) -> None:
+        self._clear()
+        self._loaded = True
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            state = {}
+        except ValueError as e:
+            print(f"Error loading memory index, starting empty: {e}")
+            state = {}
+        self.stream_positions = state.get("stream_positions", {})
+        docs = state.get("docs", [])
+        # Snapshots written before documents were kept per owner
+        if isinstance(docs, dict):
+            docs = docs.items()
+        for folder_id, doc in docs:
+            self._apply_update(folder_id, doc)
+
+    def _log(self, op: dict) -> None:
+        self._journal.append(op)
+        self._maybe_compact()
+
+    def _maybe_compact(self) -> None:
+        """Fold the journal into the snapshot once it outgrows the index."""
+        if self._journal.ops < 1000 or self._journal.ops < len(self._docs):
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            docs = [[folder_id, doc] for (_, folder_id), doc in self._docs.items()]
+            json.dump({"stream_positions": self.stream_positions, "docs": docs}, f)
+        os.replace(tmp_path, self.path)
+        # Replaying ops already in the snapshot is harmless if this is cut short
+        self._journal.rewrite([])
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_memory_index() -> MemoryIndex:
+    """Return the process-wide memory index, loading it on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = MemoryIndex(
+                os.path.join(MESH_STATE_DIR, "memory_index.json"), MEMORY_INDEX_KEYS
+            )
+        return _index
+
+
+def update_memory_index(folder_id: str, data: dict, sha1: str | None = None) -> None:
+    """Index a folder's memory document. Called by `write_memory`."""
+    get_memory_index().update(folder_id, data, current_owner(), sha1)
+
+
+def search_memory(
+    query: str | None = None, filters: dict | None = None, limit: int = 50
+) -> list[dict]:
+    """Search indexed memory across folders. See `MemoryIndex.search`.
+
+    Starts a background catch-up from Box change events if the owner has
+    not synced in the last `MEMORY_INDEX_SYNC_SECONDS`; this search does
+    not wait for it.
+    """
+    _maybe_sync()
+    return get_memory_index().search(query, filters, limit, current_owner())
+
+
+_last_sync: dict[str | None, float] = {}
+_sync_threads: dict[str | None, threading.Thread] = {}
+
+
+def _maybe_sync() -> None:
+    if not MEMORY_INDEX_SYNC_SECONDS:
+        return
+    owner = current_owner()
+    now = time.monotonic()
+    with _index_lock:
+        running = _sync_threads.get(owner)
+        if running and running.is_alive():
+            return
+        last = _last_sync.get(owner)
+        if last is not None and now - last < MEMORY_INDEX_SYNC_SECONDS:
+            return
+        _last_sync[owner] = now
+        # Run with the caller's credentials (see `clients.py`)
+        thread = threading.Thread(
+            target=contextvars.copy_context().run, args=(_sync_quietly,), daemon=True
+        )
+        _sync_threads[owner] = thread
+        thread.start()
+
+
+def _sync_quietly() -> None:
+    try:
+        sync_memory_index()
+    except Exception as e:
+        print(f"Error syncing memory index: {e}")
+
+
+def sync_memory_index(limit: int = 500) -> int:
+    """Update the index from Box change events.
+
+    Picks up memory written outside the mesh (other deployments or direct
+    edits in Box). Events for content the index already holds, such as the
+    mesh's own writes, are skipped without a download. The first call starts from the current stream
+    position; later calls replay events since the previous one. Each owner
+    has its own event stream position.
+
+    Args:
+        limit: Maximum number of events to consume in this call.
+
+    Returns:
+        The number of folders re-indexed or removed.
+    """
+    from .memory import read_memory
+
+    index = get_memory_index()
+    owner = current_owner()
+    client = get_box_client()
+    events = client.events()
+    stream_position = index.get_stream_position(owner)
+    if stream_position is None:
+        response = events.get_events(limit=0, stream_position="now")
+        index.set_stream_position(response["next_stream_position"], owner)
+        return 0
+
+    response = events.get_events(limit=limit, stream_position=stream_position)
+    changed = {}
+    for event in response["entries"]:
+        try:
+            source = event["source"]
+            if source["type"] != "file" or source["name"] != MEMORY_FILE_NAME:
+                continue
+            folder_id = source["parent"]["id"]
+        except (KeyError, TypeError):
+            continue
+        changed[folder_id] = (event["event_type"], source.get("sha1"))
+    updated = 0
+    for folder_id, (event_type, sha1) in changed.items():
+        if event_type in ("ITEM_TRASH", "ITEM_DELETE"):
+            index.remove(folder_id, owner)
+        elif index.is_current(folder_id, sha1, owner):
+            continue
+        else:
+            memory = read_memory(folder_id, resolve_blobs=False)
+            index.update(folder_id, memory, owner, sha1)
+        updated += 1
+    index.set_stream_position(response["next_stream_position"], owner)
+    return updated
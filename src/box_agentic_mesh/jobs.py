@@ -0,0 +1,378 @@
+"""
+Background Job Layer.
+
+Runs long Shadow Box operations (create and commit) outside the request that
+started them, so large folders do not hit proxy timeouts and a dropped
+connection does not leave a half-committed folder behind. Jobs run in a
+bounded worker pool, report progress, can be cancelled between files, and
+checkpoint the files they have finished so an interrupted job can be resumed.
+
+Only one shadow operation may run per folder at a time, whether it is a
+background job or a synchronous request holding the folder through
+`claim_folder`. Jobs run with the
+credentials of the request that started (or resumed) them, and are only
+visible to the Box user who started them (see `clients.py`).
+
+Job Record:
+    Each job is checkpointed to `<MESH_STATE_DIR>/jobs/<job_id>.json`.
+    Example:
+        {
+            "job_id": "5f0c...",
+            "kind": "shadow_commit",
+            "folder_id": "12345",
+            "status": "running",
+            "files_done": 40,
+            "files_total": 120,
+            "bytes_done": 10485760,
+            "bytes_total": 31457280,
+            "eta_seconds": 12.5,
+            "completed": ["report.docx", ...]
+        }
+
+Usage:
+    job = submit_job("shadow_commit", "folder_id")
+    get_job(job.job_id).to_dict()
+    cancel_job(job.job_id)
+    resume_job(job.job_id)
+
+    with claim_folder("folder_id"):  # raises JobConflictError if busy
+        commit_shadow("folder_id", approval=True)
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from .config import MESH_STATE_DIR, MESH_JOB_WORKERS
+from .shadow import create_shadow, commit_shadow
+from .clients import current_owner
+
+JOB_KINDS = ("shadow_create", "shadow_commit")
+"""Operations that can run as background jobs."""
+
+ACTIVE_STATUSES = ("queued", "running", "cancelling")
+"""Statuses of jobs that still hold their folder."""
+
+RESUMABLE_STATUSES = ("failed", "cancelled", "interrupted")
+"""Statuses from which a job can be resumed."""
+
+
+class JobConflictError(Exception):
+    """Raised when a folder already has an active job."""
+
+
+class JobNotFoundError(Exception):
+    """Raised when a job ID is unknown."""
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job to stop it between files."""
+
+
+class Job:
+    """State and progress of a single background job.
+
+    Instances double as the `progress` tracker passed to the Shadow Box
+    operations.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        folder_id: str,
+        params: dict | None = None,
+        job_id: str | None = None,
+        owner: str | None = None,
+    ):
+        self.job_id = job_id or uuid.uuid4().hex
+        self.kind = kind
+        self.folder_id = folder_id
+        self.params = params or {}
+        self.owner = owner
+        self.status = "queued"
+        self.files_done = 0
+        self.files_total = 0
+        self.bytes_done = 0
+        self.bytes_total = 0
+        self.completed: list[str] = []
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+        self._cancel_requested = threading.Event()
+
+    def start(self, files_total: int, bytes_total: int) -> None:
+        """Record the planned amount of work for this run."""
+        self.files_total = self.files_done + files_total
+        self.bytes_total = self.bytes_done + bytes_total
+        self.save()
+
+    def advance(self, name: str, size: int) -> None:
+        """Record a finished file and stop if cancellation was requested."""
+        self.files_done += 1
+        self.bytes_done += size
+        self.completed.append(name)
+        self.save()
+        if self._cancel_requested.is_set():
+            raise JobCancelled()
+
+    def eta_seconds(self) -> float | None:
+        """Estimate the remaining run time from throughput so far."""
+        if self.status != "running" or not self.started_at:
+            return None
+        elapsed = time.time() - self.started_at
+        if self.bytes_done and self.bytes_total:
+            return elapsed / self.bytes_done * (self.bytes_total - self.bytes_done)
+        if self.files_done and self.files_total:
+            return elapsed / self.files_done * (self.files_total - self.files_done)
+        return None
+
+    def to_dict(self) -> dict:
+        """Return a JSON-serialisable view of the job."""
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "folder_id": self.folder_id,
+            "params": self.params,
+            "owner": self.owner,
+            "status": self.status,
+            "files_done": self.files_done,
+            "files_total": self.files_total,
+            "bytes_done": self.bytes_done,
+            "bytes_total": self.bytes_total,
+            "eta_seconds": self.eta_seconds(),
+            "completed": self.completed,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Job":
+        """Rebuild a job from its checkpoint."""
+        job = cls(
+            data["kind"],
+            data["folder_id"],
+            data.get("params"),
+            data["job_id"],
+            data.get("owner"),
+        )
+        for key in (
+            "status",
+            "files_done",
+            "files_total",
+            "bytes_done",
+            "bytes_total",
+            "completed",
+            "result",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ):
+            if key in data:
+                setattr(job, key, data[key])
+        return job
+
+    def save(self) -> None:
+        """Write the job checkpoint to local state."""
+        path = _job_path(self.job_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+
+_lock = threading.Lock()
+_jobs: dict[str, Job] = {}
+_active_by_folder: dict[str, str] = {}
+_executor = None
+
+
+def _job_path(job_id: str) -> str:
+    return os.path.join(MESH_STATE_DIR, "jobs", f"{job_id}.json")
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=MESH_JOB_WORKERS, thread_name_prefix="mesh-job"
+        )
+    return _executor
+
+
+def _run(job: Job) -> None:
+    """Execute a job in a worker thread."""
+    if job._cancel_requested.is_set():
+        job.status = "cancelled"
+    else:
+        job.status = "running"
+        job.started_at = time.time()
+        job.save()
+        try:
+            if job.kind == "shadow_create":
+                job.result = create_shadow(
+                    job.folder_id, job.params.get("file_ids"), progress=job
+                )
+            else:
+                commit_shadow(
+                    job.folder_id,
+                    approval=True,
+                    progress=job,
+                    completed=set(job.completed),
+                )
+            job.status = "succeeded"
+        except JobCancelled:
+            job.status = "cancelled"
+        except Exception as e:
+            print(f"Job {job.job_id} failed: {e}")
+            job.status = "failed"
+            job.error = str(e)
+    job.finished_at = time.time()
+    job.save()
+    with _lock:
+        if _active_by_folder.get(job.folder_id) == job.job_id:
+            del _active_by_folder[job.folder_id]
+
+
+def _schedule(job: Job) -> Job:
+    """Claim the job's folder and hand the job to the worker pool."""
+    with _lock:
+        active_id = _active_by_folder.get(job.folder_id)
+        if active_id and active_id != job.job_id:
+            raise JobConflictError(
+                f"Folder {job.folder_id} already has active job {active_id}."
+            )
+        _active_by_folder[job.folder_id] = job.job_id
+        _jobs[job.job_id] = job
+    job.status = "queued"
+    job.error = None
+    job.finished_at = None
+    job._cancel_requested.clear()
+    job.save()
+    # Run with the caller's context so the job uses the caller's credentials
+    context = contextvars.copy_context()
+    job.future = _get_executor().submit(context.run, _run, job)
+    return job
+
+
+@contextmanager
+def claim_folder(folder_id: str):
+    """Hold a folder for a shadow operation run outside the job pool.
+
+    While held, jobs cannot be submitted or resumed for the folder.
+
+    Raises:
+        JobConflictError: If the folder already has an active job or claim.
+    """
+    claim_id = "sync-" + uuid.uuid4().hex
+    with _lock:
+        active_id = _active_by_folder.get(folder_id)
+        if active_id:
+            raise JobConflictError(
+                f"Folder {folder_id} already has active job {active_id}."
+            )
+        _active_by_folder[folder_id] = claim_id
+    try:
+        yield
+    finally:
+        with _lock:
+            if _active_by_folder.get(folder_id) == claim_id:
+                del _active_by_folder[folder_id]
+
+
+def submit_job(kind: str, folder_id: str, file_ids: list[str] | None = None) -> Job:
+    """Start a Shadow Box operation as a background job.
+
+    Args:
+        kind: Either "shadow_create" or "shadow_commit".
+        folder_id: The Box folder ID to operate on.
+        file_ids: Optional file IDs to stage (only for "shadow_create").
+
+    Returns:
+        The queued Job.
+
+    Raises:
+        ValueError: If kind is not a known job kind.
+        JobConflictError: If the folder already has an active job.
+    """
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    params = {"file_ids": file_ids} if file_ids else {}
+    return _schedule(Job(kind, folder_id, params, owner=current_owner()))
+
+
+def get_job(job_id: str) -> Job:
+    """Look up a job, loading it from its checkpoint if needed.
+
+    Jobs found on disk in an active status belonged to a process that has
+    since stopped and are reported as "interrupted".
+
+    Raises:
+        JobNotFoundError: If no job with this ID exists.
+    """
+    with _lock:
+        job = _jobs.get(job_id)
+        if job:
+            return _check_owner(job)
+        try:
+            with open(_job_path(job_id)) as f:
+                job = Job.from_dict(json.load(f))
+        except (FileNotFoundError, ValueError):
+            raise JobNotFoundError(f"Job {job_id} not found.")
+        if job.status in ACTIVE_STATUSES:
+            job.status = "interrupted"
+        _jobs[job_id] = job
+        return _check_owner(job)
+
+
+def _check_owner(job: Job) -> Job:
+    if job.owner != current_owner():
+        raise JobNotFoundError(f"Job {job.job_id} not found.")
+    return job
+
+
+def cancel_job(job_id: str) -> Job:
+    """Request cancellation of a job.
+
+    Queued jobs are cancelled immediately; running jobs stop after the file
+    currently being copied. Finished jobs are returned unchanged.
+    """
+    job = get_job(job_id)
+    if job.status not in ACTIVE_STATUSES:
+        return job
+    job._cancel_requested.set()
+    if job.future and job.future.cancel():
+        job.status = "cancelled"
+        job.finished_at = time.time()
+        job.save()
+        with _lock:
+            if _active_by_folder.get(job.folder_id) == job.job_id:
+                del _active_by_folder[job.folder_id]
+    elif job.status == "running":
+        job.status = "cancelling"
+        job.save()
+    return job
+
+
+def resume_job(job_id: str) -> Job:
+    """Re-run a failed, cancelled or interrupted job from its checkpoint.
+
+    Raises:
+        ValueError: If the job is not in a resumable state.
+        JobConflictError: If the folder has another active job.
+    """
+    job = get_job(job_id)
+    if job.status not in RESUMABLE_STATUSES:
+        raise ValueError(f"Job {job_id} is {job.status} and cannot be resumed.")
+    return _schedule(job)
@@ -0,0 +1,141 @@
+"""
+Shared State Journals.
+
+Append-only JSON-lines journals for state that the REST API and the MCP
+server each keep in memory but share through `MESH_STATE_DIR`. Every
+operation holds an exclusive lock on `<journal>.lock`, first picks up the
+lines other processes appended since this process last looked, then appends
+its own. Compaction rewrites the journal under the same lock; the other
+processes see that the file was replaced and replay it from the start.
+
+On platforms without `fcntl` the lock only covers threads, so the state is
+then safe to share within one process only.
+
+Usage:
+    journal = Journal("/path/to/state.log")
+    with journal.locked() as (reset, ops):
+        if reset:
+            ...  # the journal was replaced: drop in-memory state
+        for op in ops:
+            ...  # apply the other processes' changes
+        journal.append({"op": "update", ...})
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows: in-process locking only
+
+
+class Journal:
+    """JSON-lines journal shared between processes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.ops = 0
+        self._lock = threading.RLock()
+        self._lock_file = None
+        self._reader = None
+        self._writer = None
+        self._offset = 0
+        self._torn = False
+
+    @contextmanager
+    def locked(self):
+        """Lock the journal and read the ops appended since the last call.
+
+        Yields:
+            `(reset, ops)`: whether in-memory state must be rebuilt from
+            scratch, and the decoded ops to apply to it, in order.
+        """
+        with self._lock:
+            if fcntl and self._lock_file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._lock_file = open(self.path + ".lock", "a")
+            if fcntl:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                yield self._read()
+            finally:
+                if fcntl:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def append(self, op: dict) -> None:
+        """Append an op. Must be called inside `locked`."""
+        if self._writer is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._writer = open(self.path, "ab")
+            if self._reader is None:
+                self._reader = open(self.path, "rb")
+        line = json.dumps(op).encode("utf-8") + b"\n"
+        if self._torn:
+            # End the line a crashed writer left unfinished
+            line = b"\n" + line
+            self._torn = False
+        self._writer.write(line)
+        self._writer.flush()
+        self._offset += len(line)
+        self.ops += 1
+
+    def rewrite(self, ops: list[dict]) -> None:
+        """Replace the journal with a compacted list of ops.
+
+        Must be called inside `locked`.
+        """
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            for op in ops:
+                f.write(json.dumps(op).encode("utf-8") + b"\n")
+        self._close()
+        os.replace(tmp_path, self.path)
+        self._reader = open(self.path, "rb")
+        self._offset = os.fstat(self._reader.fileno()).st_size
+        self._torn = False
+        self.ops = len(ops)
+
+    def _read(self) -> tuple[bool, list[dict]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            reset = self._reader is not None
+            self._close()
+            self._offset = self.ops = 0
+            return reset, []
+        # The open reader keeps a replaced journal's inode from being reused
+        reset = (
+            self._reader is None
+            or os.fstat(self._reader.fileno()).st_ino != stat.st_ino
+            or stat.st_size < self._offset
+        )
+        if reset:
+            self._close()
+            self._reader = open(self.path, "rb")
+            self._offset = self.ops = 0
+            self._torn = False
+        if stat.st_size == self._offset:
+            return reset, []
+        self._reader.seek(self._offset)
+        data = self._reader.read()
+        self._offset += len(data)
+        lines = data.split(b"\n")
+        # Writers hold the lock, so an unterminated line was never finished
+        self._torn = bool(lines[-1])
+        ops = []
+        for line in lines[:-1]:
+            try:
+                ops.append(json.loads(line))
+            except ValueError:
+                continue
+        self.ops += len(ops)
+        return reset, ops
+
+    def _close(self) -> None:
+        for f in (self._reader, self._writer):
+            if f is not None:
+                f.close()
+        self._reader = self._writer = None
@@ -0,0 +1,244 @@
+"""
+Incremental JSON Parsing.
+
+Parses JSON from a stream of byte chunks (such as a Box download) without
+holding the whole document in memory. Values that are not needed are skipped
+by scanning for their closing bracket or quote rather than decoded, so a
+projection of a few keys out of a multi-megabyte memory document decodes only
+those keys, and the download can be abandoned as soon as they have been seen.
+
+Key paths use dots for nested objects: `task_id`, `draft.outline`.
+
+Usage:
+    stream = JsonStream(chunks)
+    memory = project(stream, parse_paths(["task_id", "draft.outline"]))
+
+    for key in stream.members():  # walk an object member by member
+        if key == "task_id":
+            value = stream.read_value()
+        else:
+            stream.skip_value()
+"""
+
+import codecs
+import json
+import re
+
+_STRUCTURE_RE = re.compile(r'["\[\]{}]')
+_STRING_SPECIAL_RE = re.compile(r'["\\]')
+_SCALAR_END_RE = re.compile(r"[\s,\]}]")
+_SPACE_RE = re.compile(r"\s*")
+
+
+def parse_paths(keys: list[str]) -> dict:
+    """Turn dotted key paths into a projection tree.
+
+    `["a", "b.c", "b.d"]` becomes `{"a": None, "b": {"c": None, "d": None}}`,
+    where None selects the whole value. Selecting a whole value wins over
+    selecting parts of it.
+    """
+    tree = {}
+    for key in keys:
+        node = tree
+        parts = key.split(".")
+        for part in parts[:-1]:
+            child = node.get(part, {})
+            if child is None:
+                break
+            node = node.setdefault(part, child)
+        else:
+            node[parts[-1]] = None
+    return tree
+
+
+def select_paths(data, paths: dict):
+    """Apply a projection tree to an already decoded value.
+
+    Returns None if the value is not an object. Paths into values that are
+    not objects are left out of the result.
+    """
+    if not isinstance(data, dict):
+        return None
+    result = {}
+    for key, sub in paths.items():
+        if key not in data:
+            continue
+        value = data[key] if sub is None else select_paths(data[key], sub)
+        if sub is None or value is not None:
+            result[key] = value
+    return result
+
+
+class JsonStream:
+    """Pull parser over an iterable of UTF-8 byte chunks."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character, or "" at the end."""
+        while True:
+            self._pos = _SPACE_RE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf) or not self._fill():
+                return self._buf[self._pos : self._pos + 1]
+
+    def scan_value(self):
+        """Consume the next value, yielding its JSON text in pieces.
+
+        Raises:
+            ValueError: If the stream ends inside the value.
+        """
+        first = self.peek()
+        if not first:
+            raise ValueError("Unexpected end of JSON stream")
+        mark = self._pos
+        if first not in '{["':
+            while True:
+                match = _SCALAR_END_RE.search(self._buf, self._pos)
+                if match:
+                    self._pos = match.start()
+                    break
+                self._pos = len(self._buf)
+                yield self._buf[mark : self._pos]
+                more = self._fill()
+                mark = self._pos
+                if not more:
+                    return
+            yield self._buf[mark : self._pos]
+            return
+
+        depth = 0
+        in_string = False
+        while True:
+            if in_string:
+                match = _STRING_SPECIAL_RE.search(self._buf, self._pos)
+                if match and match.group() == '"':
+                    self._pos = match.end()
+                    in_string = False
+                    if not depth:
+                        break
+                    continue
+                if match and match.end() < len(self._buf):
+                    # Step over the escaped character
+                    self._pos = match.end() + 1
+                    continue
+                self._pos = match.start() if match else len(self._buf)
+            else:
+                match = _STRUCTURE_RE.search(self._buf, self._pos)
+                if match:
+                    self._pos = match.end()
+                    char = match.group()
+                    if char == '"':
+                        in_string = True
+                    elif char in "{[":
+                        depth += 1
+                    else:
+                        depth -= 1
+                        if not depth:
+                            break
+                    continue
+                self._pos = len(self._buf)
+            # The value continues past the buffered text
+            if self._pos > mark:
+                yield self._buf[mark : self._pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON stream")
+            mark = self._pos
+        yield self._buf[mark : self._pos]
+
+    def read_value(self):
+        """Consume and decode the next value."""
+        return json.loads("".join(self.scan_value()))
+
+    def skip_value(self) -> None:
+        """Consume the next value without decoding it."""
+        for _ in self.scan_value():
+            pass
+
+    def members(self):
+        """Iterate over the keys of the object at the current position.
+
+        After each key is yielded, the caller must consume its value with
+        `read_value`, `skip_value` or `scan_value` before continuing.
+
+        Raises:
+            ValueError: If the next value is not a well-formed object.
+        """
+        self._expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.read_value()
+            if not isinstance(key, str):
+                raise ValueError("Expected a string key in JSON object")
+            self._expect(":")
+            yield key
+            char = self.peek()
+            self._pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise ValueError(f"Expected ',' or '}}' in JSON object, got {char!r}")
+
+    def _expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON stream, got {found!r}")
+        self._pos += 1
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer, dropping consumed text."""
+        while not self._eof:
+            try:
+                chunk = next(self._chunks)
+            except StopIteration:
+                self._eof = True
+                text = self._decoder.decode(b"", final=True)
+            else:
+                text = self._decoder.decode(chunk)
+            if text or self._eof:
+                self._buf = self._buf[self._pos :] + text
+                self._pos = 0
+                return bool(text)
+        return False
+
+
+def project(stream: JsonStream, paths: dict, stop_early: bool = True):
+    """Decode only the selected paths of the object at the stream position.
+
+    Args:
+        stream: Stream positioned at the value to project.
+        paths: Projection tree from `parse_paths`.
+        stop_early: Return as soon as every selected key has been read,
+                    leaving the rest of the stream unread. Nested objects
+                    are always consumed to their end.
+
+    Returns:
+        A dict holding the selected keys that were present, or None if the
+        value is not an object.
+    """
+    if stream.peek() != "{":
+        stream.skip_value()
+        return None
+    result = {}
+    remaining = set(paths)
+    for key in stream.members():
+        if key not in remaining:
+            stream.skip_value()
+            continue
+        sub = paths[key]
+        if sub is None:
+            result[key] = stream.read_value()
+        else:
+            value = project(stream, sub, stop_early=False)
+            if value is not None:
+                result[key] = value
+        remaining.discard(key)
+        if stop_early and not remaining:
+            break
+    return result
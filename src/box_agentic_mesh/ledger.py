@@ -16,6 +16,38 @@ Log Format:
             "reasoning": "Identified 3 key benefits..."
         }
 
+Deduplicated Text:
+    Prompts and reasoning longer than `LEDGER_BLOB_THRESHOLD` bytes are stored
+    once per folder as content-addressed blobs (see `blobs.py`), and the entry
+    holds a reference instead:
+        "prompt": {"$blob": "sha256:...", "size": 18230}
+    Repeated system prompts and templates therefore cost one upload in total.
+    `read_ledger` and `export_ledger` resolve references back to the text,
+    leaving a reference in place if its blob cannot be found.
+
+Rollups:
+    Alongside the log, each folder keeps `.reasoning_ledger.rollup.json` with
+    entry counts and byte sizes per (hour, action, model). `log_action`
+    updates it on every append, so analytics read a small summary instead of
+    the whole log.
+    Example:
+        {
+            "entries": 2,
+            "bytes": 512,
+            "buckets": {
+                "2026-01-14T10": {
+                    "research_completed": {
+                        "GPT-4": {
+                            "count": 2,
+                            "bytes": 512,
+                            "prompt_bytes": 96,
+                            "reasoning_bytes": 64
+                        }
+                    }
+                }
+            }
+        }
+
 Usage:
     log_action(
         folder_id="folder_id",
@@ -24,24 +56,44 @@ Usage:
         model="GPT-4",
         reasoning="Decision rationale"
     )
+
+    # Actions per model per hour across folders
+    stats = ledger_stats(["folder_a", "folder_b"])
 """
 
 import json
 import io
 from datetime import datetime
 from boxsdk import Client, OAuth2
-from .config import BOX_CLIENT_ID, BOX_CLIENT_SECRET, BOX_ACCESS_TOKEN
+from .config import (
+    BOX_CLIENT_ID,
+    BOX_CLIENT_SECRET,
+    BOX_ACCESS_TOKEN,
+    LEDGER_BLOB_THRESHOLD,
+)
+from .clients import get_request_client
+from .blobs import blob_ref, is_blob_ref, store_blobs, load_blob
+
+LEDGER_FILE_NAME = ".reasoning_ledger.log"
+ROLLUP_FILE_NAME = ".reasoning_ledger.rollup.json"
+BLOB_FIELDS = ("prompt", "reasoning")
 
 
 def get_box_client() -> Client:
     """Create and return an authenticated Box client.
 
+    Inside a request that carried its own Box credential, returns that
+    tenant's cached client (see `clients.py`).
+
     Returns:
         Authenticated Box SDK Client instance.
 
     Raises:
         ValueError: If BOX_ACCESS_TOKEN is not configured.
     """
+    client = get_request_client()
+    if client:
+        return client
     if BOX_ACCESS_TOKEN:
         oauth = OAuth2(
             client_id=BOX_CLIENT_ID,
@@ -64,7 +116,9 @@ def log_action(
 
     Appends a new entry to the `.reasoning_ledger.log` file in the specified
     folder. The log entry includes timestamp, action type, and optional
-    metadata about the LLM interaction.
+    metadata about the LLM interaction. Long prompts and reasoning are
+    stored as blobs, uploaded only if the folder does not already hold the
+    same text. The folder's rollup is updated to count the new entry.
 
     Args:
         folder_id: The Box folder ID to log to.
@@ -83,21 +137,322 @@ def log_action(
         "model": model,
         "reasoning": reasoning,
     }
+    blobs = {}
+    for field in BLOB_FIELDS:
+        data = (log_entry[field] or "").encode("utf-8")
+        if LEDGER_BLOB_THRESHOLD and len(data) > LEDGER_BLOB_THRESHOLD:
+            log_entry[field] = blob_ref(data)
+            blobs[log_entry[field]["$blob"]] = data
+    store_blobs(client, folder_id, blobs)
     log_line = json.dumps(log_entry) + "\n"
 
     log_file = None
+    rollup_file = None
     for item in folder.get_items():
-        if item.name == ".reasoning_ledger.log" and item.type == "file":
+        if item.name == LEDGER_FILE_NAME and item.type == "file":
             log_file = item
-            break
+        elif item.name == ROLLUP_FILE_NAME and item.type == "file":
+            rollup_file = item
     if log_file:
         current_content = log_file.content().decode("utf-8")
         new_content = current_content + log_line
         log_file.delete()
-        folder.upload_stream(
-            io.BytesIO(new_content.encode("utf-8")), ".reasoning_ledger.log"
-        )
+        folder.upload_stream(io.BytesIO(new_content.encode("utf-8")), LEDGER_FILE_NAME)
     else:
-        folder.upload_stream(
-            io.BytesIO(log_line.encode("utf-8")), ".reasoning_ledger.log"
+        folder.upload_stream(io.BytesIO(log_line.encode("utf-8")), LEDGER_FILE_NAME)
+
+    try:
+        rollup = _empty_rollup()
+        if rollup_file:
+            rollup = json.loads(rollup_file.content().decode("utf-8"))
+        elif log_file:
+            # First rollup for an existing ledger: backfill from its history
+            rollup = _rollup_lines(current_content.splitlines())
+        _add_to_rollup(rollup, log_entry, len(log_line.encode("utf-8")))
+        _save_rollup(folder, rollup_file, rollup)
+    except Exception as e:
+        print(f"Error updating ledger rollup: {e}")
+
+
+def _empty_rollup() -> dict:
+    return {"entries": 0, "bytes": 0, "buckets": {}}
+
+
+def _add_to_rollup(rollup: dict, entry: dict, size: int) -> None:
+    """Count one ledger entry into its (hour, action, model) bucket."""
+    hour = (entry.get("timestamp") or "unknown")[:13]
+    action = entry.get("action") or "unknown"
+    model = entry.get("model") or "unknown"
+    bucket = (
+        rollup["buckets"]
+        .setdefault(hour, {})
+        .setdefault(action, {})
+        .setdefault(
+            model, {"count": 0, "bytes": 0, "prompt_bytes": 0, "reasoning_bytes": 0}
         )
+    )
+    bucket["count"] += 1
+    bucket["bytes"] += size
+    bucket["prompt_bytes"] += _text_size(entry.get("prompt"))
+    bucket["reasoning_bytes"] += _text_size(entry.get("reasoning"))
+    rollup["entries"] += 1
+    rollup["bytes"] += size
+
+
+def _text_size(value) -> int:
+    if is_blob_ref(value):
+        return value["size"]
+    return len((value or "").encode("utf-8"))
+
+
+def _rollup_lines(lines) -> dict:
+    rollup = _empty_rollup()
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        _add_to_rollup(rollup, entry, len(line.encode("utf-8")) + 1)
+    return rollup
+
+
+def _save_rollup(folder, rollup_file, rollup: dict) -> None:
+    content = io.BytesIO(json.dumps(rollup, separators=(",", ":")).encode("utf-8"))
+    if rollup_file:
+        rollup_file.update_contents_with_stream(content)
+    else:
+        folder.upload_stream(content, ROLLUP_FILE_NAME)
+
+
+def export_ledger(folder_id: str, resolve_blobs: bool = True):
+    """Iterate over the ledger entries of a Box folder, oldest first.
+
+    The ledger and the blobs it refers to are downloaded before this
+    returns, so errors are raised here rather than part-way through the
+    iteration. Each blob is downloaded at most once per call, however many
+    entries refer to it. Malformed lines are skipped.
+
+    Args:
+        folder_id: The Box folder ID to read the ledger from.
+        resolve_blobs: If False, long text is left as blob references.
+
+    Returns:
+        An iterator of ledger entries as dictionaries.
+    """
+    client = get_box_client()
+    folder = client.folder(folder_id)
+    log_file = None
+    for item in folder.get_items():
+        if item.name == LEDGER_FILE_NAME and item.type == "file":
+            log_file = item
+            break
+    if not log_file:
+        return iter(())
+    content = log_file.content().decode("utf-8")
+    texts = {}
+    if resolve_blobs:
+        for line in content.splitlines():
+            # Only entries with a reference need decoding twice
+            if '"$blob"' not in line:
+                continue
+            try:
+                _load_texts(client, folder_id, json.loads(line), texts)
+            except ValueError:
+                continue
+    return _iter_entries(client, folder_id, content, resolve_blobs, texts)
+
+
+def _iter_entries(
+    client, folder_id: str, content: str, resolve_blobs: bool, texts: dict
+):
+    for line in content.splitlines():
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if resolve_blobs:
+            _resolve_entry(client, folder_id, entry, texts)
+        yield entry
+
+
+def read_ledger(
+    folder_id: str, limit: int | None = None, resolve_blobs: bool = True
+) -> list[dict]:
+    """Read the ledger entries of a Box folder.
+
+    Args:
+        folder_id: The Box folder ID to read the ledger from.
+        limit: Optional maximum number of entries, counted from the newest.
+        resolve_blobs: If False, long text is left as blob references.
+
+    Returns:
+        Ledger entries, oldest first, with prompts and reasoning as text.
+    """
+    entries = list(export_ledger(folder_id, resolve_blobs=False))
+    if limit is not None:
+        entries = entries[-limit:] if limit > 0 else []
+    if resolve_blobs:
+        client = get_box_client()
+        texts = {}
+        for entry in entries:
+            _resolve_entry(client, folder_id, entry, texts)
+    return entries
+
+
+def _resolve_entry(client, folder_id: str, entry: dict, texts: dict) -> None:
+    """Replace blob references in an entry, caching text by hash in `texts`.
+
+    A reference whose blob cannot be found is left in place.
+    """
+    _load_texts(client, folder_id, entry, texts)
+    for field in BLOB_FIELDS:
+        ref = entry.get(field)
+        if is_blob_ref(ref) and texts[ref["$blob"]] is not None:
+            entry[field] = texts[ref["$blob"]]
+
+
+def _load_texts(client, folder_id: str, entry: dict, texts: dict) -> None:
+    """Download the text behind an entry's references, or None if missing."""
+    for field in BLOB_FIELDS:
+        ref = entry.get(field)
+        if is_blob_ref(ref) and ref["$blob"] not in texts:
+            try:
+                data = load_blob(client, folder_id, ref)
+            except KeyError as e:
+                print(f"Error loading blob {ref['$blob']}: {e}")
+                texts[ref["$blob"]] = None
+            else:
+                texts[ref["$blob"]] = data.decode("utf-8")
+
+
+def read_rollup(folder_id: str) -> dict:
+    """Read the ledger rollup of a Box folder.
+
+    Args:
+        folder_id: The Box folder ID to read the rollup from.
+
+    Returns:
+        The rollup, or an empty rollup if the folder has none.
+    """
+    client = get_box_client()
+    folder = client.folder(folder_id)
+    for item in folder.get_items():
+        if item.name == ROLLUP_FILE_NAME and item.type == "file":
+            return json.loads(item.content().decode("utf-8"))
+    return _empty_rollup()
+
+
+def rebuild_rollup(folder_id: str) -> dict:
+    """Recompute a folder's rollup from its full ledger.
+
+    Use this to backfill or repair a rollup; normal logging keeps it
+    up to date incrementally.
+
+    Args:
+        folder_id: The Box folder ID whose ledger to scan.
+
+    Returns:
+        The rebuilt rollup.
+    """
+    client = get_box_client()
+    folder = client.folder(folder_id)
+    log_file = None
+    rollup_file = None
+    for item in folder.get_items():
+        if item.name == LEDGER_FILE_NAME and item.type == "file":
+            log_file = item
+        elif item.name == ROLLUP_FILE_NAME and item.type == "file":
+            rollup_file = item
+    rollup = _empty_rollup()
+    if log_file:
+        rollup = _rollup_lines(log_file.content().decode("utf-8").splitlines())
+    _save_rollup(folder, rollup_file, rollup)
+    return rollup
+
+
+def merge_rollups(rollups: list[dict]) -> dict:
+    """Merge rollups from several folders into one."""
+    merged = _empty_rollup()
+    for rollup in rollups:
+        merged["entries"] += rollup["entries"]
+        merged["bytes"] += rollup["bytes"]
+        for hour, actions in rollup["buckets"].items():
+            for action, models in actions.items():
+                for model, counts in models.items():
+                    bucket = (
+                        merged["buckets"]
+                        .setdefault(hour, {})
+                        .setdefault(action, {})
+                        .setdefault(model, dict.fromkeys(counts, 0))
+                    )
+                    for key, value in counts.items():
+                        bucket[key] = bucket.get(key, 0) + value
+    return merged
+
+
+def ledger_stats(
+    folder_ids: list[str], since: str | None = None, until: str | None = None
+) -> dict:
+    """Summarise ledger activity across folders from their rollups.
+
+    Cost depends on the number of (hour, action, model) buckets, not on
+    the length of the ledgers.
+
+    Args:
+        folder_ids: Box folder IDs to include.
+        since: Optional first hour to include, e.g. "2026-01-14T10".
+        until: Optional last hour to include, e.g. "2026-01-14T18".
+
+    Returns:
+        Totals plus breakdowns by hour, action, model and folder, and the
+        merged (hour, action, model) buckets.
+    """
+    rollups = {folder_id: read_rollup(folder_id) for folder_id in folder_ids}
+    by_folder = {}
+    for folder_id, rollup in rollups.items():
+        rollup["buckets"] = {
+            hour: actions
+            for hour, actions in rollup["buckets"].items()
+            if (not since or hour >= since[:13]) and (not until or hour <= until[:13])
+        }
+        by_folder[folder_id] = _totals(rollup["buckets"])
+    merged = merge_rollups(list(rollups.values()))
+
+    by_hour = {}
+    by_action = {}
+    by_model = {}
+    for hour, actions in merged["buckets"].items():
+        for action, models in actions.items():
+            for model, counts in models.items():
+                for key, group in (
+                    (hour, by_hour),
+                    (action, by_action),
+                    (model, by_model),
+                ):
+                    totals = group.setdefault(key, {"count": 0, "bytes": 0})
+                    totals["count"] += counts["count"]
+                    totals["bytes"] += counts["bytes"]
+
+    return {
+        **_totals(merged["buckets"]),
+        "by_hour": dict(sorted(by_hour.items())),
+        "by_action": by_action,
+        "by_model": by_model,
+        "by_folder": by_folder,
+        "buckets": merged["buckets"],
+    }
+
+
+def _totals(buckets: dict) -> dict:
+    count = 0
+    size = 0
+    for actions in buckets.values():
+        for models in actions.values():
+            for counts in models.values():
+                count += counts["count"]
+                size += counts["bytes"]
+    return {"count": count, "bytes": size}
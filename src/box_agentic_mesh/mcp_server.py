@@ -4,22 +4,74 @@ Model Context Protocol (MCP) Server for Box Agentic Mesh.
 Exposes the three core layers as MCP tools for AI agents.
 Compatible with MCP-compatible clients like Claude, Cursor, etc.
 
+Tool calls run with the caller's own Box credential when the session has
+one: the access token from MCP auth, or an `Authorization: Bearer` header on
+HTTP transports (see `clients.py`). Otherwise the configured token is used.
+
 Run with: python -m src.box_agentic_mesh.mcp_server
 
 Available Tools:
-    - hand_off_task: Write task data to agent memory
+    - hand_off_task: Write task data to agent memory and queue the hand-off
+    - claim_hand_off_task: Claim queued work for an agent type
+    - complete_hand_off_task: Acknowledge claimed work
+    - release_hand_off_task: Give claimed work back to the queue
     - read_agent_memory: Read current agent memory
+    - search_agent_memory: Find folders by indexed memory fields or text
     - create_shadow_staging: Create Shadow Box staging area
     - commit_shadow_changes: Commit staged changes
     - log_agent_action: Log an agent action for audit
+    - read_reasoning_ledger: Read recent ledger entries
+    - get_ledger_stats: Summarise ledger activity across folders
+    - start_shadow_job: Run shadow create/commit as a background job
+    - get_job_status: Poll a background job's progress
+    - cancel_shadow_job: Cancel a background job
+    - resume_shadow_job: Resume a failed or interrupted job from its checkpoint
 """
 
+import anyio
+from mcp.server.auth.middleware.auth_context import get_access_token
 from mcp.server.fastmcp import FastMCP
-from .memory import read_memory, write_memory
+from mcp.server.lowlevel.server import request_ctx
+from .clients import resolve_credential, activate
+from .memory import read_memory, write_memory, flush_memory
 from .shadow import create_shadow, commit_shadow
-from .ledger import log_action
+from .ledger import log_action, ledger_stats, read_ledger
+from .index import search_memory
+from .handoff import enqueue_hand_off, claim_hand_off, ack_hand_off, nack_hand_off
+from .jobs import submit_job, get_job, cancel_job, resume_job, claim_folder
+
+
+class MeshMCP(FastMCP):
+    """FastMCP server that runs each tool call as the caller's tenant."""
+
+    async def call_tool(self, name: str, arguments: dict):
+        token = _session_credential()
+        if not token:
+            return await super().call_tool(name, arguments)
+        session = await anyio.to_thread.run_sync(resolve_credential, token)
+        with activate(session):
+            return await super().call_tool(name, arguments)
+
+
+def _session_credential() -> str | None:
+    """Return the Box token presented by the current MCP session, if any."""
+    access_token = get_access_token()
+    if access_token:
+        return access_token.token
+    try:
+        request = request_ctx.get().request
+    except LookupError:
+        return None
+    headers = getattr(request, "headers", None)
+    if not headers:
+        return None
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer":
+        return None
+    return token.strip() or None
+
 
-app = FastMCP("Box Agentic Mesh")
+app = MeshMCP("Box Agentic Mesh")
 
 
 @app.tool()
@@ -28,6 +80,9 @@ async def hand_off_task(folder_id: str, task_data: dict) -> str:
 
     This enables seamless task transfer between agents by storing
     the current task state in Box for the next agent to retrieve.
+    If `task_data` names a `hand_off_to` agent type, the hand-off is also
+    queued so that agent can claim it with `claim_hand_off_task`, after any
+    coalesced memory writes to the folder have been uploaded.
 
     Args:
         folder_id: Box folder ID to store memory in.
@@ -38,11 +93,71 @@ async def hand_off_task(folder_id: str, task_data: dict) -> str:
     """
     write_memory(folder_id, task_data)
     log_action(folder_id, "hand_off", reasoning="Agent handoff via MCP")
+    if task_data.get("hand_off_to"):
+        # The claiming agent may read memory from another process
+        flush_memory(folder_id)
+        payload = {
+            key: task_data[key] for key in ("task_id", "topic") if key in task_data
+        }
+        enqueue_hand_off(folder_id, task_data["hand_off_to"], payload)
     return "Task handed off successfully."
 
 
 @app.tool()
-async def read_agent_memory(folder_id: str) -> dict:
+async def claim_hand_off_task(
+    agent: str, lease_seconds: float | None = None
+) -> dict | None:
+    """Claim the oldest queued hand-off for an agent type.
+
+    The claim is leased: no other agent receives it until the lease
+    expires. Read the folder's memory, do the work, then call
+    `complete_hand_off_task` with the message ID and receipt.
+
+    Args:
+        agent: Your agent type, e.g. "Writing Agent".
+        lease_seconds: How long to hold the claim (optional).
+
+    Returns:
+        The hand-off with `folder_id`, `message_id` and `receipt`,
+        or None if no work is waiting.
+    """
+    return claim_hand_off(agent, lease_seconds)
+
+
+@app.tool()
+async def complete_hand_off_task(message_id: str, receipt: str) -> str:
+    """Acknowledge a claimed hand-off as done.
+
+    Args:
+        message_id: ID from `claim_hand_off_task`.
+        receipt: Receipt from `claim_hand_off_task`.
+
+    Returns:
+        Confirmation message.
+    """
+    ack_hand_off(message_id, receipt)
+    return "Hand-off completed."
+
+
+@app.tool()
+async def release_hand_off_task(message_id: str, receipt: str) -> str:
+    """Give a claimed hand-off back so another agent can claim it.
+
+    Args:
+        message_id: ID from `claim_hand_off_task`.
+        receipt: Receipt from `claim_hand_off_task`.
+
+    Returns:
+        Confirmation message.
+    """
+    nack_hand_off(message_id, receipt)
+    return "Hand-off released."
+
+
+@app.tool()
+async def read_agent_memory(
+    folder_id: str, resolve_blobs: bool = True, keys: list[str] | None = None
+) -> dict:
     """Read the current agent memory from a Box folder.
 
     Retrieves the `.agent_memory.json` file contents, providing
@@ -50,11 +165,37 @@ async def read_agent_memory(folder_id: str) -> dict:
 
     Args:
         folder_id: Box folder ID to read memory from.
+        resolve_blobs: Set to False to get large values as blob references
+                       (e.g. when only `hand_off_to` or `topic` is needed).
+        keys: Only return these keys, using dots for nested keys
+              (e.g. ["task_id", "hand_off_to", "draft.outline"]). Much
+              faster than reading a large memory document in full.
 
     Returns:
         Dictionary containing the memory data.
     """
-    return read_memory(folder_id)
+    return read_memory(folder_id, resolve_blobs, keys)
+
+
+@app.tool()
+async def search_agent_memory(
+    query: str | None = None, filters: dict | None = None, limit: int = 50
+) -> list[dict]:
+    """Search agent memory across all indexed folders.
+
+    Answers questions like "which folders have a hand-off pending to
+    Writing Agent" without reading every folder's memory.
+
+    Args:
+        query: Words that must all appear in the memory's text (optional).
+        filters: Exact values for indexed keys such as `task_id`,
+                 `hand_off_to` or `topic` (optional).
+        limit: Maximum number of results.
+
+    Returns:
+        List of matching folders with their indexed fields.
+    """
+    return search_memory(query, filters, limit)
 
 
 @app.tool()
@@ -71,8 +212,12 @@ async def create_shadow_staging(
 
     Returns:
         Confirmation message with shadow folder ID.
+
+    Raises:
+        JobConflictError: If a background job is running on the folder.
     """
-    shadow_id = create_shadow(folder_id, file_ids)
+    with claim_folder(folder_id):
+        shadow_id = create_shadow(folder_id, file_ids)
     log_action(folder_id, "create_shadow", reasoning="Shadow staging created via MCP")
     return f"Shadow created with ID: {shadow_id}"
 
@@ -88,8 +233,12 @@ async def commit_shadow_changes(folder_id: str) -> str:
 
     Returns:
         Confirmation message.
+
+    Raises:
+        JobConflictError: If a background job is running on the folder.
     """
-    commit_shadow(folder_id, approval=True)
+    with claim_folder(folder_id):
+        commit_shadow(folder_id, approval=True)
     log_action(folder_id, "commit_shadow", reasoning="Shadow changes committed via MCP")
     return "Changes committed to production."
 
@@ -118,3 +267,110 @@ async def log_agent_action(
     """
     log_action(folder_id, action, prompt, model, reasoning)
     return "Action logged."
+
+
+@app.tool()
+async def read_reasoning_ledger(folder_id: str, limit: int = 50) -> list[dict]:
+    """Read the most recent reasoning ledger entries for a folder.
+
+    Args:
+        folder_id: Box folder ID to read the ledger from.
+        limit: Maximum number of entries, newest last.
+
+    Returns:
+        List of ledger entries with prompts and reasoning as text.
+    """
+    return read_ledger(folder_id, limit)
+
+
+@app.tool()
+async def get_ledger_stats(
+    folder_ids: list[str], since: str | None = None, until: str | None = None
+) -> dict:
+    """Summarise reasoning ledger activity across folders.
+
+    Served from per-folder rollups, so the cost does not grow with
+    ledger length.
+
+    Args:
+        folder_ids: Box folder IDs to include.
+        since: Optional first hour, e.g. "2026-01-14T10".
+        until: Optional last hour, e.g. "2026-01-14T18".
+
+    Returns:
+        Counts and byte sizes by hour, action, model and folder.
+    """
+    return ledger_stats(folder_ids, since, until)
+
+
+@app.tool()
+async def start_shadow_job(
+    folder_id: str, operation: str, file_ids: list[str] | None = None
+) -> dict:
+    """Start a Shadow Box create or commit as a background job.
+
+    Returns immediately; poll `get_job_status` instead of blocking on
+    large folders. Only one job may run per folder.
+
+    Args:
+        folder_id: Box folder ID to operate on.
+        operation: Either "create" or "commit".
+        file_ids: Optional list of specific file IDs to stage ("create" only).
+
+    Returns:
+        Dictionary with the job ID and initial status.
+    """
+    job = submit_job(f"shadow_{operation}", folder_id, file_ids)
+    log_action(
+        folder_id,
+        f"{operation}_shadow_job",
+        reasoning=f"Shadow {operation} job {job.job_id} started via MCP",
+    )
+    return job.to_dict()
+
+
+@app.tool()
+async def get_job_status(job_id: str) -> dict:
+    """Get the progress of a background job.
+
+    Args:
+        job_id: ID returned by `start_shadow_job`.
+
+    Returns:
+        Dictionary with status, files and bytes done, totals and ETA.
+    """
+    return get_job(job_id).to_dict()
+
+
+@app.tool()
+async def cancel_shadow_job(job_id: str) -> dict:
+    """Cancel a background job.
+
+    Running jobs stop after the file currently being copied.
+
+    Args:
+        job_id: ID returned by `start_shadow_job`.
+
+    Returns:
+        Dictionary with the job's updated status.
+    """
+    return cancel_job(job_id).to_dict()
+
+
+@app.tool()
+async def resume_shadow_job(job_id: str) -> dict:
+    """Resume a failed, cancelled or interrupted background job.
+
+    Files finished before the job stopped are skipped.
+
+    Args:
+        job_id: ID returned by `start_shadow_job`.
+
+    Returns:
+        Dictionary with the job's updated status.
+
+    Raises:
+        ValueError: If the job is not in a resumable state.
+        JobConflictError: If the folder has another active job.
+    """
+    return resume_job(job_id).to_dict()
@@ -22,28 +22,81 @@ Usage:
 
     # Write memory to a folder
     write_memory("folder_id", {"task": "analysis", "status": "in_progress"})
+
+    # Read only some keys; the download stops once they have been parsed
+    memory = read_memory("folder_id", keys=["task_id", "draft.outline"])
+
+    # Read only the inline document, leaving large values as blob references
+    memory = read_memory("folder_id", resolve_blobs=False)
+    memory = resolve_memory_blobs("folder_id", memory, keys=["key_points"])
+
+Large Values:
+    Top-level values whose JSON encoding is larger than `MEMORY_BLOB_THRESHOLD`
+    bytes are stored as content-addressed blobs (see `blobs.py`) and replaced
+    by a reference such as {"$blob": "sha256:...", "size": 5242880}. Readers
+    that only need small fields like `hand_off_to` can skip the blobs, and a
+    rewrite only uploads values whose content changed. A reference whose blob
+    cannot be found, such as a stored value that only looks like one, is
+    returned unchanged rather than failing the read.
+
+Write Coalescing:
+    With `MEMORY_COALESCE_WINDOW` set, the first write to a folder starts a
+    window of that many seconds. Writes to the folder inside the window are
+    merged in memory (last writer wins per key, or a caller-supplied merge
+    function) and uploaded once when it ends. Reads by the same user in this
+    process see the pending state. `flush_memory()` uploads pending writes immediately and
+    runs automatically at interpreter exit.
 """
 
+import atexit
+import contextvars
+import hashlib
+import itertools
 import os
 import sys
+import threading
 from dotenv import load_dotenv
 
 load_dotenv()
 import json
 import io
 from boxsdk import Client, OAuth2
-from .config import BOX_CLIENT_ID, BOX_CLIENT_SECRET, BOX_ACCESS_TOKEN
+from .config import (
+    BOX_CLIENT_ID,
+    BOX_CLIENT_SECRET,
+    BOX_ACCESS_TOKEN,
+    MEMORY_BLOB_THRESHOLD,
+    MEMORY_COALESCE_WINDOW,
+)
+from .clients import get_request_client, current_owner
+from .blobs import blob_ref, is_blob_ref, store_blobs, load_blob
+from .jsonstream import JsonStream, parse_paths, select_paths, project
+from .index import update_memory_index
+
+MEMORY_FILE_NAME = ".agent_memory.json"
+
+DOWNLOAD_CHUNK_SIZE = 65536
+"""Bytes read at a time when streaming a memory file or blob."""
+
+_BLOB_REF_MAX_CHARS = 512
+"""Longer values are streamed as-is without checking for a blob reference."""
 
 
 def get_box_client() -> Client:
     """Create and return an authenticated Box client.
 
+    Inside a request that carried its own Box credential, returns that
+    tenant's cached client (see `clients.py`).
+
     Returns:
         Authenticated Box SDK Client instance.
 
     Raises:
         ValueError: If BOX_ACCESS_TOKEN is not configured.
     """
+    client = get_request_client()
+    if client:
+        return client
     if BOX_ACCESS_TOKEN:
         oauth = OAuth2(
             client_id=BOX_CLIENT_ID,
@@ -55,7 +108,9 @@ def get_box_client() -> Client:
     return Client(oauth)
 
 
-def read_memory(folder_id: str) -> dict:
+def read_memory(
+    folder_id: str, resolve_blobs: bool = True, keys: list[str] | None = None
+) -> dict:
     """Read agent memory from a Box folder.
 
     Retrieves the `.agent_memory.json` file from the specified folder and
@@ -64,53 +119,381 @@ def read_memory(folder_id: str) -> dict:
 
     Args:
         folder_id: The Box folder ID to read memory from.
+        resolve_blobs: If False, large values are returned as blob references
+                       and only the small inline document is downloaded.
+        keys: Optional key paths to return, using dots for nested keys
+              (e.g. ["task_id", "draft.outline"]). The file is parsed as it
+              downloads and the download stops once they have been found.
 
     Returns:
         Dictionary containing the memory data, or empty dict if no memory exists.
     """
+    paths = parse_paths(keys) if keys else None
+    pending = _pending_memory(folder_id)
+    if pending is not None:
+        data = pending if resolve_blobs else _offload_blobs(pending)[0]
+        return select_paths(data, paths) if paths else data
     client = get_box_client()
     folder = client.folder(folder_id)
     try:
-        memory_file = None
-        for item in folder.get_items():
-            if item.name == ".agent_memory.json" and item.type == "file":
-                memory_file = item
-                break
+        memory_file = _find_memory_file(folder)
         if not memory_file:
             return {}
+        if paths:
+            return _read_projected(
+                client, folder_id, memory_file.id, paths, resolve_blobs
+            )
         content = memory_file.content()
-        return json.loads(content.decode("utf-8"))
+        data = json.loads(content.decode("utf-8"))
+        if resolve_blobs:
+            data = _resolve(client, folder_id, data, None)
+        return data
     except Exception as e:
         print(f"Error reading memory: {e}")
         return {}
 
 
-def write_memory(folder_id: str, data: dict) -> None:
+def stream_memory(folder_id: str, resolve_blobs: bool = True):
+    """Stream a folder's memory document as JSON without decoding it.
+
+    The memory file is located and the first `DOWNLOAD_CHUNK_SIZE` bytes of
+    output are produced before this returns, so a missing credential, an
+    unreadable folder or a malformed document (within its first chunk; in
+    practice, any document whose large values are offloaded to blobs) raises
+    here rather than part-way through the stream. With `resolve_blobs`, blob
+    references are replaced by the blob contents as they download; a blob
+    that cannot be found is left as its reference.
+
+    Returns:
+        An iterator of UTF-8 encoded JSON chunks.
+    """
+    pending = _pending_memory(folder_id)
+    if pending is not None:
+        data = pending if resolve_blobs else _offload_blobs(pending)[0]
+        return iter([json.dumps(data).encode("utf-8")])
+    client = get_box_client()
+    memory_file = _find_memory_file(client.folder(folder_id))
+    if not memory_file:
+        return iter([b"{}"])
+    chunks = _iter_content(client, memory_file.id)
+    output = _stream_document(client, folder_id, chunks, resolve_blobs)
+    head = []
+    size = 0
+    for piece in output:
+        head.append(piece)
+        size += len(piece)
+        if size >= DOWNLOAD_CHUNK_SIZE:
+            break
+    return itertools.chain(head, output)
+
+
+def _find_memory_file(folder):
+    for item in folder.get_items():
+        if item.name == MEMORY_FILE_NAME and item.type == "file":
+            return item
+    return None
+
+
+def _iter_content(client, file_id: str):
+    """Start downloading a file and return an iterator over its chunks.
+
+    Closing the iterator abandons the rest of the download.
+    """
+    url = client.file(file_id).get_url("content")
+    box_response = client.session.get(url, expect_json_response=False, stream=True)
+    raw = box_response.network_response.response_as_stream
+
+    def chunks():
+        try:
+            yield from raw.stream(DOWNLOAD_CHUNK_SIZE, decode_content=True)
+        finally:
+            raw.close()
+
+    return chunks()
+
+
+def _read_projected(
+    client, folder_id: str, file_id: str, paths: dict, resolve_blobs: bool
+) -> dict:
+    """Parse the selected paths out of a memory file as it downloads."""
+    chunks = _iter_content(client, file_id)
+    try:
+        stream = JsonStream(chunks)
+        result = {}
+        remaining = set(paths)
+        if stream.peek() != "{":
+            return result
+        for key in stream.members():
+            if key not in remaining:
+                stream.skip_value()
+                continue
+            sub = paths[key]
+            if sub is None:
+                value = stream.read_value()
+            else:
+                # Keep blob reference fields so an offloaded value is recognised
+                value = project(
+                    stream, {**sub, "$blob": None, "size": None}, stop_early=False
+                )
+            if is_blob_ref(value):
+                if resolve_blobs:
+                    value = _read_blob(client, folder_id, value, sub)
+            elif sub is not None:
+                value = select_paths(value, sub)
+            if value is not None or sub is None:
+                result[key] = value
+            remaining.discard(key)
+            if not remaining:
+                break
+        return result
+    finally:
+        chunks.close()
+
+
+def _read_blob(client, folder_id: str, ref: dict, paths: dict | None):
+    """Load an offloaded value, or only the selected paths within it.
+
+    Returns the reference itself if the blob cannot be found.
+    """
+    try:
+        if paths is None:
+            return json.loads(load_blob(client, folder_id, ref))
+        chunks = load_blob(client, folder_id, ref, _iter_content)
+    except KeyError as e:
+        print(f"Error loading blob {ref['$blob']}: {e}")
+        return ref
+    try:
+        return project(JsonStream(chunks), paths)
+    finally:
+        chunks.close()
+
+
+def _stream_document(client, folder_id: str, chunks, resolve_blobs: bool):
+    """Re-emit a memory document, replacing blob references with content."""
+    try:
+        stream = JsonStream(chunks)
+        separator = "{"
+        for key in stream.members():
+            yield f"{separator}{json.dumps(key)}: ".encode("utf-8")
+            separator = ", "
+            pieces = stream.scan_value()
+            head = ""
+            for piece in pieces:
+                head += piece
+                if len(head) > _BLOB_REF_MAX_CHARS:
+                    break
+            else:
+                value = json.loads(head)
+                if resolve_blobs and is_blob_ref(value):
+                    blob_chunks = _open_blob(client, folder_id, value)
+                    if blob_chunks:
+                        yield from blob_chunks
+                        continue
+            yield head.encode("utf-8")
+            for piece in pieces:
+                yield piece.encode("utf-8")
+        yield b"{}" if separator == "{" else b"}"
+    finally:
+        chunks.close()
+
+
+def _open_blob(client, folder_id: str, ref: dict):
+    """Start downloading a blob, or return None if it cannot be found."""
+    try:
+        return load_blob(client, folder_id, ref, _iter_content)
+    except Exception as e:
+        print(f"Error loading blob {ref['$blob']}: {e}")
+        return None
+
+
+def resolve_memory_blobs(
+    folder_id: str, data: dict, keys: list[str] | None = None
+) -> dict:
+    """Replace blob references in a memory document with their values.
+
+    Args:
+        folder_id: The Box folder ID the memory was read from.
+        data: Memory read with `resolve_blobs=False`.
+        keys: Optional top-level keys to resolve. If None, resolves all.
+
+    Returns:
+        A copy of the memory with the requested values loaded.
+    """
+    return _resolve(get_box_client(), folder_id, data, keys)
+
+
+def _resolve(client, folder_id: str, data: dict, keys: list[str] | None) -> dict:
+    resolved = dict(data)
+    for key, value in data.items():
+        if is_blob_ref(value) and (keys is None or key in keys):
+            # Values that only look like references are returned unchanged
+            resolved[key] = _read_blob(client, folder_id, value, None)
+    return resolved
+
+
+def _offload_blobs(data: dict) -> tuple[dict, dict[str, bytes]]:
+    """Split large values out of a memory document.
+
+    Returns:
+        The document with large values replaced by references, and the
+        blob payloads keyed by hash.
+    """
+    if not MEMORY_BLOB_THRESHOLD:
+        return data, {}
+    document = {}
+    blobs = {}
+    for key, value in data.items():
+        encoded = json.dumps(value).encode("utf-8")
+        if len(encoded) > MEMORY_BLOB_THRESHOLD:
+            ref = blob_ref(encoded)
+            blobs[ref["$blob"]] = encoded
+            document[key] = ref
+        else:
+            document[key] = value
+    return document, blobs
+
+
+class _PendingWrite:
+    """Merged memory waiting for its coalescing window to end."""
+
+    def __init__(self, data: dict):
+        self.data = data
+        self.context = contextvars.copy_context()
+        self.timer = None
+
+
+_pending_lock = threading.Lock()
+_pending: dict[tuple, _PendingWrite] = {}
+_flushing: dict[tuple, dict] = {}
+_flush_locks: dict[tuple, list] = {}
+
+
+def _pending_memory(folder_id: str) -> dict | None:
+    """Return a copy of memory not yet uploaded for a folder, if any."""
+    key = (current_owner(), folder_id)
+    with _pending_lock:
+        pending = _pending.get(key)
+        data = pending.data if pending else _flushing.get(key)
+        return dict(data) if data is not None else None
+
+
+def write_memory(folder_id: str, data: dict, merge=None) -> None:
     """Write agent memory to a Box folder.
 
     Creates or updates the `.agent_memory.json` file in the specified folder.
     If the file exists, it updates the contents; otherwise, it creates a new file.
+    Large values are uploaded as blobs first, skipping any whose content the
+    folder already holds. The written document is added to the local search
+    index (see `index.py`).
+
+    With `MEMORY_COALESCE_WINDOW` set, the write is merged into the folder's
+    pending memory and uploaded when the window ends.
 
     Args:
         folder_id: The Box folder ID to write memory to.
         data: Dictionary containing the memory data to store.
+        merge: Optional function `merge(pending, data) -> dict` combining a
+               coalesced write with the folder's pending memory. Defaults to
+               last writer wins per key.
+    """
+    if not MEMORY_COALESCE_WINDOW:
+        _write_memory_now(folder_id, data)
+        return
+    key = (current_owner(), folder_id)
+    with _pending_lock:
+        pending = _pending.get(key)
+        if pending:
+            if merge:
+                pending.data = merge(dict(pending.data), data)
+            else:
+                pending.data = {**pending.data, **data}
+            return
+        pending = _PendingWrite(dict(data))
+        pending.timer = threading.Timer(MEMORY_COALESCE_WINDOW, _flush_pending, (key,))
+        pending.timer.daemon = True
+        _pending[key] = pending
+    pending.timer.start()
+
+
+def flush_memory(folder_id: str | None = None) -> int:
+    """Upload coalesced memory writes now instead of at the end of the window.
+
+    Also waits for uploads already in progress, so the folder's memory is in
+    Box when this returns.
+
+    Args:
+        folder_id: Folder to flush. If None, flushes every folder.
+
+    Returns:
+        The number of folders uploaded.
+    """
+    with _pending_lock:
+        keys = {
+            key for key in (*_pending, *_flush_locks) if folder_id in (None, key[1])
+        }
+    flushed = 0
+    for key in keys:
+        with _pending_lock:
+            pending = _pending.get(key)
+        if pending:
+            pending.timer.cancel()
+        flushed += _flush_pending(key)
+    return flushed
+
+
+def _flush_pending(key: tuple) -> int:
+    """Upload one folder's pending memory, in the context of its first write.
+
+    Waits for an upload of the same folder that is already in progress.
     """
+    with _pending_lock:
+        # [lock, number of flushes holding or waiting for it]
+        flush_lock = _flush_locks.setdefault(key, [threading.Lock(), 0])
+        flush_lock[1] += 1
+    try:
+        # Uploads of the same folder must land in the order they were merged
+        with flush_lock[0]:
+            with _pending_lock:
+                pending = _pending.pop(key, None)
+                if not pending:
+                    return 0
+                _flushing[key] = pending.data
+            try:
+                pending.context.run(_write_memory_now, key[1], pending.data)
+            finally:
+                with _pending_lock:
+                    if _flushing.get(key) is pending.data:
+                        del _flushing[key]
+        return 1
+    finally:
+        with _pending_lock:
+            flush_lock[1] -= 1
+            if not flush_lock[1]:
+                del _flush_locks[key]
+
+
+atexit.register(flush_memory)
+
+
+def _write_memory_now(folder_id: str, data: dict) -> None:
+    """Upload a memory document and index it."""
     client = get_box_client()
     folder = client.folder(folder_id)
-    memory_json = json.dumps(data, indent=2)
+    document, blobs = _offload_blobs(data)
+    memory_bytes = json.dumps(document, indent=2).encode("utf-8")
     try:
-        memory_file = None
-        for item in folder.get_items():
-            if item.name == ".agent_memory.json" and item.type == "file":
-                memory_file = item
-                break
+        store_blobs(client, folder_id, blobs)
+        memory_file = _find_memory_file(folder)
         if memory_file:
-            memory_file.update_contents_with_stream(
-                io.BytesIO(memory_json.encode("utf-8"))
-            )
+            memory_file.update_contents_with_stream(io.BytesIO(memory_bytes))
         else:
-            folder.upload_stream(
-                io.BytesIO(memory_json.encode("utf-8")), ".agent_memory.json"
-            )
+            folder.upload_stream(io.BytesIO(memory_bytes), MEMORY_FILE_NAME)
     except Exception as e:
         print(f"Error writing memory: {e}")
+        return
+    try:
+        # Box reports the same SHA-1 in the events for this upload
+        sha1 = hashlib.sha1(memory_bytes).hexdigest()
+        update_memory_index(folder_id, document, sha1)
+    except Exception as e:
+        print(f"Error indexing memory: {e}")
@@ -19,22 +19,36 @@ Usage:
 
     # Commit approved changes to production
     commit_shadow("folder_id", approval=True)
+
+Progress:
+    Both operations accept an optional `progress` tracker, used by the
+    background job runner (see `jobs.py`). The tracker must provide
+    `start(files_total, bytes_total)`, called once the work is planned, and
+    `advance(name, size)`, called after each file is copied. `advance` may
+    raise to abort the operation between files.
 """
 
 import io
 from boxsdk import Client, OAuth2
 from .config import BOX_CLIENT_ID, BOX_CLIENT_SECRET, BOX_ACCESS_TOKEN
+from .clients import get_request_client
 
 
 def get_box_client() -> Client:
     """Create and return an authenticated Box client.
 
+    Inside a request that carried its own Box credential, returns that
+    tenant's cached client (see `clients.py`).
+
     Returns:
         Authenticated Box SDK Client instance.
 
     Raises:
         ValueError: If BOX_ACCESS_TOKEN is not configured.
     """
+    client = get_request_client()
+    if client:
+        return client
     if BOX_ACCESS_TOKEN:
         oauth = OAuth2(
             client_id=BOX_CLIENT_ID,
@@ -46,16 +60,21 @@ def get_box_client() -> Client:
     return Client(oauth)
 
 
-def create_shadow(folder_id: str, file_ids: list[str] | None = None) -> str:
+def create_shadow(
+    folder_id: str, file_ids: list[str] | None = None, progress=None
+) -> str:
     """Create a Shadow Box staging subfolder.
 
     Creates a `[SHADOW]` subfolder in the specified folder and copies
     either the specified files or all files from the parent folder.
+    Files already present in the shadow are skipped, so an interrupted
+    call can simply be repeated.
 
     Args:
         folder_id: The Box folder ID to create shadow staging in.
         file_ids: Optional list of specific file IDs to copy. If None,
                   copies all files from the parent folder.
+        progress: Optional progress tracker (see module docstring).
 
     Returns:
         The Box folder ID of the created shadow folder.
@@ -80,19 +99,33 @@ def create_shadow(folder_id: str, file_ids: list[str] | None = None) -> str:
                 existing_shadow_files.add(item.name)
 
     if file_ids:
-        for file_id in file_ids:
-            file = client.file(file_id)
-            if file.name not in existing_shadow_files:
-                file.copy(parent_folder=shadow_folder)
+        files = [
+            client.file(file_id).get(fields=["name", "size"]) for file_id in file_ids
+        ]
     else:
-        for item in folder.get_items():
-            if item.type == "file" and item.name not in existing_shadow_files:
-                item.copy(parent_folder=shadow_folder)
+        files = [
+            item
+            for item in folder.get_items(fields=["name", "size"])
+            if item.type == "file"
+        ]
+    pending = [file for file in files if file.name not in existing_shadow_files]
+
+    if progress:
+        progress.start(len(pending), sum(_size(file) for file in pending))
+    for file in pending:
+        file.copy(parent_folder=shadow_folder)
+        if progress:
+            progress.advance(file.name, _size(file))
 
     return shadow_folder.id
 
 
-def commit_shadow(folder_id: str, approval: bool = False) -> None:
+def commit_shadow(
+    folder_id: str,
+    approval: bool = False,
+    progress=None,
+    completed: set[str] | None = None,
+) -> None:
     """Commit staged changes from Shadow Box to production.
 
     Copies files from the shadow folder to the main folder, overwriting
@@ -102,6 +135,9 @@ def commit_shadow(folder_id: str, approval: bool = False) -> None:
         folder_id: The Box folder ID containing the shadow staging area.
         approval: Boolean flag requiring explicit approval before commit.
                   Set to True to actually perform the commit.
+        progress: Optional progress tracker (see module docstring).
+        completed: Names of staged files already committed by an earlier,
+                   interrupted run. These are skipped.
     """
     if not approval:
         print("Approval required for commit. Set approval=True to proceed.")
@@ -120,18 +156,33 @@ def commit_shadow(folder_id: str, approval: bool = False) -> None:
         print("No shadow folder found.")
         return
 
-    for item in shadow_folder.get_items():
-        if item.type == "file":
-            main_file = None
-            for main_item in folder.get_items():
-                if main_item.name == item.name and main_item.type == "file":
-                    main_file = main_item
-                    break
-            if main_file:
-                content = item.content()
-                main_file.delete()
-                folder.upload_stream(io.BytesIO(content), main_file.name)
-            else:
-                item.copy(parent_folder=folder)
+    completed = completed or set()
+    staged = [
+        item
+        for item in shadow_folder.get_items(fields=["name", "size"])
+        if item.type == "file" and item.name not in completed
+    ]
+    main_files = {item.name: item for item in folder.get_items() if item.type == "file"}
+
+    if progress:
+        progress.start(len(staged), sum(_size(item) for item in staged))
+    for item in staged:
+        main_file = main_files.get(item.name)
+        if main_file:
+            content = item.content()
+            main_file.delete()
+            folder.upload_stream(io.BytesIO(content), main_file.name)
+        else:
+            item.copy(parent_folder=folder)
+        if progress:
+            progress.advance(item.name, _size(item))
 
     shadow_folder.delete()
+
+
+def _size(item) -> int:
+    """Return the byte size of a Box item, or 0 if it was not fetched."""
+    try:
+        return int(item.size or 0)
+    except (AttributeError, TypeError, ValueError):
+        return 0
@@ -0,0 +1,28 @@
+"""
+Shared fixtures for the Box Agentic Mesh tests.
+
+Keeps local mesh state (such as the memory search index) in a temporary
+directory so tests never write to the working tree, and starts each test
+with empty in-process caches.
+"""
+
+import pytest
+from box_agentic_mesh import blobs, index
+
+
+@pytest.fixture(autouse=True)
+def blob_cache(monkeypatch):
+    monkeypatch.setattr(blobs, "_blob_folders", {})
+    monkeypatch.setattr(blobs, "_known_blobs", {})
+
+
+@pytest.fixture(autouse=True)
+def memory_index(tmp_path, monkeypatch):
+    test_index = index.MemoryIndex(
+        str(tmp_path / "memory_index.json"), ("task_id", "hand_off_to", "topic")
+    )
+    monkeypatch.setattr(index, "_index", test_index)
+    monkeypatch.setattr(index, "MEMORY_INDEX_SYNC_SECONDS", 0)
+    monkeypatch.setattr(index, "_last_sync", {})
+    monkeypatch.setattr(index, "_sync_threads", {})
+    return test_index
@@ -0,0 +1,92 @@
+"""
+Unit tests for the Box Agentic Mesh per-request credentials module.
+
+Tests cover the client cache, tenant rate limits, per-user visibility of
+shared mesh state, and the API's use of per-request credentials. Uses mocking to avoid requiring actual Box API calls.
+"""
+
+import pytest
+from unittest.mock import patch, MagicMock
+from fastapi.testclient import TestClient
+from box_agentic_mesh import clients, handoff
+from box_agentic_mesh.api import app
+from box_agentic_mesh.index import update_memory_index, search_memory
+
+
+def fake_session(token):
+    return clients.TenantSession(MagicMock(name=token), f"user:{token}")
+
+
+@patch("box_agentic_mesh.clients._authenticate", side_effect=fake_session)
+def test_client_cache_reuses_and_evicts(mock_authenticate):
+    """Test that sessions are reused, evicted LRU, and expire after the TTL."""
+    cache = clients.ClientCache(maxsize=2, ttl=60)
+
+    first = cache.get("a")
+    assert cache.get("a") is first
+    cache.get("b")
+    cache.get("a")
+    cache.get("c")  # evicts "b", the least recently used
+    assert mock_authenticate.call_count == 3
+    cache.get("b")
+    assert mock_authenticate.call_count == 4
+
+    cache.ttl = 0
+    assert cache.get("a") is not first
+
+
+def test_token_bucket_limits_bursts():
+    """Test that a bucket allows its burst and then asks the caller to wait."""
+    bucket = clients.TokenBucket(rate=1, burst=2)
+
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert 0 < bucket.try_acquire() <= 1
+
+
+@patch("box_agentic_mesh.api.resolve_credential")
+def test_api_uses_request_credential(mock_resolve, monkeypatch):
+    """Test that a bearer token selects the tenant client and rate limit."""
+    monkeypatch.setattr(clients, "_cache", clients.ClientCache(maxsize=8, ttl=60))
+    monkeypatch.setattr(clients, "MESH_TENANT_RATE", 0.001)
+    monkeypatch.setattr(clients, "MESH_TENANT_BURST", 1)
+    session = fake_session("tenant-token")
+    mock_resolve.side_effect = lambda token: session
+    memory_file = MagicMock()
+    memory_file.name = ".agent_memory.json"
+    memory_file.type = "file"
+    session.client.folder.return_value.get_items.return_value = [memory_file]
+    download = session.client.session.get.return_value.network_response
+    download.response_as_stream.stream.return_value = iter([b'{"topic": "tenant"}'])
+    api = TestClient(app)
+    headers = {"Authorization": "Bearer tenant-token"}
+
+    response = api.get("/memory/folder_id", headers=headers)
+    assert response.json() == {"memory": {"topic": "tenant"}}
+    mock_resolve.assert_called_once_with("tenant-token")
+
+    response = api.get("/memory/folder_id", headers=headers)
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+
+
+def test_enterprise_users_share_rate_limit_but_not_state(tmp_path, monkeypatch):
+    """Test that colleagues share a rate limit but not each other's work."""
+    monkeypatch.setattr(clients, "_cache", clients.ClientCache(maxsize=8, ttl=60))
+    monkeypatch.setattr(clients, "MESH_TENANT_RATE", 0.001)
+    monkeypatch.setattr(clients, "MESH_TENANT_BURST", 2)
+    monkeypatch.setattr(
+        handoff, "_queue", handoff.HandOffQueue(str(tmp_path / "queue.log"))
+    )
+    alice = clients.TenantSession(MagicMock(), "enterprise:1", "user:1")
+    bob = clients.TenantSession(MagicMock(), "enterprise:1", "user:2")
+
+    with clients.activate(alice):
+        update_memory_index("f1", {"task_id": "t1"})
+        handoff.enqueue_hand_off("f1", "Writing Agent")
+    with clients.activate(bob):
+        assert search_memory(filters={"task_id": "t1"}) == []
+        assert handoff.claim_hand_off("Writing Agent") is None
+    with pytest.raises(clients.RateLimitError):
+        with clients.activate(alice):
+            pass
@@ -0,0 +1,124 @@
+"""
+Unit tests for the Box Agentic Mesh hand-off queue.
+
+Tests cover leased claims, acknowledgement, lease expiry, de-duplication,
+recovery from the journal, and sharing the queue between processes.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import patch, MagicMock
+from box_agentic_mesh import handoff, memory
+from box_agentic_mesh.handoff import HandOffQueue, LeaseError
+from box_agentic_mesh.mcp_server import hand_off_task
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return HandOffQueue(str(tmp_path / "handoff_queue.log"))
+
+
+def test_claim_is_exclusive_until_acked(queue):
+    """Test that a claimed hand-off goes to exactly one agent."""
+    queue.enqueue("f1", "Writing Agent", {"task_id": "t1"})
+
+    message = queue.claim("Writing Agent")
+    assert message["folder_id"] == "f1"
+    assert message["payload"] == {"task_id": "t1"}
+    assert queue.claim("Writing Agent") is None
+    assert queue.claim("Review Agent") is None
+
+    queue.ack(message["message_id"], message["receipt"])
+    assert queue.depth() == {}
+
+
+def test_expired_lease_is_redelivered(queue):
+    """Test that an expired claim returns to the queue and its receipt dies."""
+    queue.enqueue("f1", "Writing Agent")
+    first = queue.claim("Writing Agent", lease_seconds=10)
+
+    with patch(
+        "box_agentic_mesh.handoff.time.time", return_value=first["lease_expires"]
+    ):
+        second = queue.claim("Writing Agent")
+        assert second["message_id"] == first["message_id"]
+        assert second["attempts"] == 2
+        with pytest.raises(LeaseError):
+            queue.ack(first["message_id"], first["receipt"])
+        queue.ack(second["message_id"], second["receipt"])
+
+
+def test_requeue_of_waiting_folder_is_deduplicated(queue):
+    """Test that re-queueing a waiting folder updates the existing message."""
+    first = queue.enqueue("f1", "Writing Agent", {"topic": "a"})
+    second = queue.enqueue("f1", "Writing Agent", {"topic": "b"})
+
+    assert second["message_id"] == first["message_id"]
+    assert queue.claim("Writing Agent")["payload"] == {"topic": "b"}
+    assert queue.claim("Writing Agent") is None
+
+
+def test_state_survives_restart(queue):
+    """Test that waiting and leased hand-offs are restored from the journal."""
+    queue.enqueue("f1", "Writing Agent")
+    queue.enqueue("f2", "Writing Agent")
+    leased = queue.claim("Writing Agent")
+    done = queue.enqueue("f3", "Review Agent")
+    queue.ack(done["message_id"], queue.claim("Review Agent")["receipt"])
+
+    restored = HandOffQueue(queue.path)
+
+    assert restored.depth() == {"Writing Agent": {"waiting": 1, "leased": 1}}
+    assert restored.claim("Writing Agent")["folder_id"] == "f2"
+    restored.ack(leased["message_id"], leased["receipt"])
+
+
+def test_queue_is_shared_between_processes(queue):
+    """Test that queues on one journal see each other's changes."""
+    other = HandOffQueue(queue.path)
+    queue.enqueue("f1", "Writing Agent")
+
+    message = other.claim("Writing Agent")
+    assert message["folder_id"] == "f1"
+    assert queue.claim("Writing Agent") is None
+    restarted = HandOffQueue(queue.path)
+    assert restarted.claim("Writing Agent") is None
+    queue.ack(message["message_id"], message["receipt"])
+    assert other.depth() == {}
+
+    # Compaction in one process must not lose the other's messages
+    for i in range(600):
+        done = other.enqueue(f"done{i}", "Review Agent")
+        other.ack(done["message_id"], other.claim("Review Agent")["receipt"])
+        if i == 300:
+            queue.enqueue("f2", "Writing Agent")
+    assert restarted.claim("Writing Agent")["folder_id"] == "f2"
+    assert other.claim("Writing Agent") is None
+    with open(queue.path) as f:
+        assert len(f.readlines()) < 1000
+
+
+@patch("box_agentic_mesh.mcp_server.log_action")
+@patch("box_agentic_mesh.memory.MEMORY_COALESCE_WINDOW", 60)
+@patch("box_agentic_mesh.memory.get_box_client")
+def test_hand_off_uploads_coalesced_memory_first(mock_client, mock_log, queue):
+    """Test that a hand-off is only queued once its memory is in Box."""
+    mock_folder = MagicMock()
+    mock_folder.get_items.return_value = []
+    mock_client.return_value.folder.return_value = mock_folder
+    uploads_at_enqueue = []
+
+    def enqueue(*args, **kwargs):
+        uploads_at_enqueue.append(mock_folder.upload_stream.call_count)
+        return HandOffQueue.enqueue(queue, *args, **kwargs)
+
+    with patch.object(handoff, "_queue", queue), patch.object(
+        queue, "enqueue", side_effect=enqueue
+    ):
+        asyncio.run(
+            hand_off_task("f1", {"task_id": "t1", "hand_off_to": "Writing Agent"})
+        )
+
+    assert uploads_at_enqueue == [1]
+    assert memory._pending == {} and memory._flush_locks == {}
+    assert queue.claim("Writing Agent")["folder_id"] == "f1"
@@ -0,0 +1,143 @@
+"""
+Unit tests for the Box Agentic Mesh memory search index.
+
+Tests cover exact-match and full-text lookups, re-indexing, persistence,
+indexing on write, syncing from Box events, and sharing between processes. Uses mocking to avoid requiring actual Box API calls.
+"""
+
+from unittest.mock import patch, MagicMock
+from box_agentic_mesh import index
+from box_agentic_mesh.index import MemoryIndex, search_memory, sync_memory_index
+from box_agentic_mesh.memory import write_memory
+
+
+def test_search_by_field_and_text(memory_index):
+    """Test that filters and query terms must all match."""
+    memory_index.update(
+        "f1", {"task_id": "t1", "hand_off_to": "Writing Agent", "topic": "Box Mesh"}
+    )
+    memory_index.update(
+        "f2", {"task_id": "t2", "hand_off_to": "Review Agent", "topic": "Box Mesh"}
+    )
+
+    results = memory_index.search(filters={"hand_off_to": "Writing Agent"})
+    assert [r["folder_id"] for r in results] == ["f1"]
+    results = memory_index.search(query="box mesh")
+    assert {r["folder_id"] for r in results} == {"f1", "f2"}
+    assert memory_index.search(query="mesh", filters={"task_id": "t3"}) == []
+
+
+def test_reindex_replaces_old_postings(memory_index, tmp_path):
+    """Test that a rewrite drops stale entries and survives a reload."""
+    memory_index.update("f1", {"hand_off_to": "Writing Agent", "notes": "draft"})
+    memory_index.update("f1", {"hand_off_to": None, "notes": "published"})
+
+    reloaded = MemoryIndex(memory_index.path, memory_index.keys)
+    for idx in (memory_index, reloaded):
+        assert idx.search(filters={"hand_off_to": "Writing Agent"}) == []
+        assert idx.search(query="draft") == []
+        assert [r["folder_id"] for r in idx.search(query="published")] == ["f1"]
+
+
+@patch("box_agentic_mesh.memory.get_box_client")
+def test_write_memory_updates_index(mock_client, memory_index):
+    """Test that writing memory makes the folder searchable."""
+    mock_folder = MagicMock()
+    mock_folder.get_items.return_value = []
+    mock_client.return_value.folder.return_value = mock_folder
+
+    write_memory("folder_id", {"task_id": "research-001"})
+
+    results = memory_index.search(filters={"task_id": "research-001"})
+    assert [r["folder_id"] for r in results] == ["folder_id"]
+
+
+def test_updates_are_journaled_and_compacted(memory_index):
+    """Test that updates append to the journal and fold into the snapshot."""
+    memory_index.update("f1", {"task_id": "t1"})
+    with open(memory_index.journal_path) as f:
+        assert len(f.readlines()) == 1
+
+    for i in range(1000):
+        memory_index.update(f"f{i % 10}", {"task_id": f"t{i}"})
+    memory_index.remove("f0")
+
+    with open(memory_index.journal_path) as f:
+        assert len(f.readlines()) < 10
+    reloaded = MemoryIndex(memory_index.path, memory_index.keys)
+    results = reloaded.search(filters={"task_id": "t999"})
+    assert [r["folder_id"] for r in results] == ["f9"]
+    assert reloaded.search(filters={"task_id": "t990"}) == []
+
+
+@patch("box_agentic_mesh.index.get_box_client")
+def test_search_syncs_from_box_events(mock_client, monkeypatch, memory_index):
+    """Test that searches catch up from Box events at most once per interval."""
+    monkeypatch.setattr(index, "MEMORY_INDEX_SYNC_SECONDS", 30)
+    events = mock_client.return_value.events.return_value
+    events.get_events.return_value = {"entries": [], "next_stream_position": 7}
+
+    search_memory(query="anything")
+    index._sync_threads[None].join(timeout=5)
+    search_memory(query="anything")
+
+    assert events.get_events.call_count == 1
+    assert memory_index.stream_positions == {"": 7}
+
+
+@patch("box_agentic_mesh.memory.read_memory")
+@patch("box_agentic_mesh.index.get_box_client")
+def test_sync_skips_content_already_indexed(mock_client, mock_read, memory_index):
+    """Test that events for the mesh's own uploads are not downloaded again."""
+    memory_index.update("f1", {"task_id": "t1"}, sha1="aaa")
+    memory_index.update("f2", {"task_id": "t2"}, sha1="bbb")
+    memory_index.set_stream_position(1)
+    mock_read.return_value = {"task_id": "t3"}
+
+    def event(folder_id, sha1):
+        source = {"type": "file", "name": ".agent_memory.json", "sha1": sha1}
+        source["parent"] = {"id": folder_id}
+        return {"event_type": "ITEM_UPLOAD", "source": source}
+
+    events = mock_client.return_value.events.return_value
+    events.get_events.return_value = {
+        "entries": [event("f1", "aaa"), event("f2", "ccc")],
+        "next_stream_position": 2,
+    }
+
+    assert sync_memory_index() == 1
+    mock_read.assert_called_once_with("f2", resolve_blobs=False)
+    assert [r["folder_id"] for r in memory_index.search(filters={"task_id": "t3"})] == [
+        "f2"
+    ]
+
+
+def test_index_is_shared_between_processes(memory_index):
+    """Test that indexes on one journal see each other's updates."""
+    other = MemoryIndex(memory_index.path, memory_index.keys)
+    memory_index.update("f1", {"task_id": "t1"})
+    assert [r["folder_id"] for r in other.search(filters={"task_id": "t1"})] == ["f1"]
+
+    # Compaction in one process must not lose the other's updates
+    for i in range(1200):
+        other.update(f"g{i % 10}", {"task_id": f"t{i}"})
+        if i == 500:
+            memory_index.update("f2", {"task_id": "shared"})
+    for idx in (memory_index, other, MemoryIndex(other.path, other.keys)):
+        results = idx.search(filters={"task_id": "shared"})
+        assert [r["folder_id"] for r in results] == ["f2"]
+    with open(memory_index.journal_path) as f:
+        assert len(f.readlines()) < 1000
+
+
+def test_shared_folder_is_indexed_per_owner(memory_index):
+    """Test that users sharing a folder keep their own entries for it."""
+    memory_index.update("shared", {"task_id": "t1"}, owner="user:1")
+    memory_index.update("shared", {"task_id": "t2"}, owner="user:2")
+    memory_index.remove("shared", owner="user:2")
+
+    for idx in (memory_index, MemoryIndex(memory_index.path, memory_index.keys)):
+        results = idx.search(filters={"task_id": "t1"}, owner="user:1")
+        assert [r["folder_id"] for r in results] == ["shared"]
+        assert idx.search(owner="user:2") == []
+        assert idx.search(filters={"task_id": "t1"}) == []
@@ -0,0 +1,98 @@
+"""
+Unit tests for the Box Agentic Mesh background job module.
+
+Tests cover running shadow commits as jobs, per-folder exclusivity,
+and resuming from a checkpoint. Uses mocking to avoid requiring actual
+Box API calls.
+"""
+
+import asyncio
+import threading
+import pytest
+from unittest.mock import patch, MagicMock
+from fastapi.testclient import TestClient
+from box_agentic_mesh import jobs
+from box_agentic_mesh.api import app
+from box_agentic_mesh.mcp_server import resume_shadow_job
+
+
+def make_item(name, item_type="file", size=10):
+    item = MagicMock()
+    item.name = name
+    item.type = item_type
+    item.size = size
+    return item
+
+
+@pytest.fixture(autouse=True)
+def job_state(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "MESH_STATE_DIR", str(tmp_path))
+    monkeypatch.setattr(jobs, "_jobs", {})
+    monkeypatch.setattr(jobs, "_active_by_folder", {})
+
+
+@patch("box_agentic_mesh.shadow.get_box_client")
+def test_commit_job_reports_progress(mock_client):
+    """Test that a commit job copies every staged file and records progress."""
+    shadow_folder = make_item("[SHADOW]", "folder")
+    shadow_folder.get_items.return_value = [make_item("a.txt"), make_item("b.txt")]
+    folder = MagicMock()
+    folder.get_items.return_value = [shadow_folder]
+    mock_client.return_value.folder.return_value = folder
+
+    job = jobs.submit_job("shadow_commit", "folder_id")
+    job.future.result(timeout=5)
+
+    status = jobs.get_job(job.job_id).to_dict()
+    assert status["status"] == "succeeded"
+    assert status["files_done"] == status["files_total"] == 2
+    assert status["bytes_done"] == 20
+    shadow_folder.delete.assert_called_once()
+
+
+@patch("box_agentic_mesh.shadow.get_box_client")
+def test_one_active_job_per_folder(mock_client):
+    """Test that jobs and synchronous shadow requests exclude each other."""
+    release = threading.Event()
+    folder = MagicMock()
+    folder.get_items.side_effect = lambda *a, **k: release.wait(5) and []
+    mock_client.return_value.folder.return_value = folder
+
+    job = jobs.submit_job("shadow_commit", "folder_id")
+    with pytest.raises(jobs.JobConflictError):
+        jobs.submit_job("shadow_create", "folder_id")
+    response = TestClient(app).post("/shadow/commit/folder_id")
+    assert response.status_code == 409
+    release.set()
+    job.future.result(timeout=5)
+
+    with jobs.claim_folder("folder_id"):
+        with pytest.raises(jobs.JobConflictError):
+            jobs.submit_job("shadow_commit", "folder_id")
+    jobs.submit_job("shadow_commit", "folder_id").future.result(timeout=5)
+
+
+@patch("box_agentic_mesh.shadow.get_box_client")
+def test_resume_skips_checkpointed_files(mock_client):
+    """Test that a resumed commit skips files finished before interruption."""
+    staged = [make_item("a.txt"), make_item("b.txt")]
+    shadow_folder = make_item("[SHADOW]", "folder")
+    shadow_folder.get_items.return_value = staged
+    folder = MagicMock()
+    folder.get_items.return_value = [shadow_folder]
+    mock_client.return_value.folder.return_value = folder
+
+    job = jobs.Job("shadow_commit", "folder_id", job_id="job1")
+    job.status = "running"
+    job.completed = ["a.txt"]
+    job.files_done = 1
+    job.save()
+    jobs._jobs.clear()
+
+    assert jobs.get_job("job1").status == "interrupted"
+    assert asyncio.run(resume_shadow_job("job1"))["job_id"] == "job1"
+    jobs.get_job("job1").future.result(timeout=5)
+
+    staged[0].copy.assert_not_called()
+    staged[1].copy.assert_called_once()
+    assert jobs.get_job("job1").files_done == 2
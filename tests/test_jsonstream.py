@@ -0,0 +1,71 @@
+"""
+Unit tests for the Box Agentic Mesh incremental JSON parser.
+
+Tests cover decoding across arbitrary chunk boundaries, key-path
+projection, and stopping early once the selected keys have been read.
+"""
+
+import json
+import pytest
+from box_agentic_mesh.jsonstream import (
+    JsonStream,
+    parse_paths,
+    project,
+    select_paths,
+)
+
+DOCUMENT = {
+    "task_id": "research-001",
+    "notes": 'quotes " and \\ backslashes, brackets {[ ]} and unicode é 😀',
+    "draft": {"outline": ["intro", "body"], "body": "x" * 500, "n": 1.5e3},
+    "sources": [{"url": "https://example.com"}, None, True, False, -12],
+    "hand_off_to": "Writing Agent",
+}
+
+
+def chunked(data: bytes, size: int) -> list[bytes]:
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 100000])
+def test_projection_across_chunk_boundaries(size):
+    """Test that values split mid-token, mid-escape or mid-character decode."""
+    data = json.dumps(DOCUMENT, indent=2, ensure_ascii=False).encode("utf-8")
+    paths = parse_paths(["task_id", "draft.outline", "draft.n", "hand_off_to"])
+
+    assert JsonStream(chunked(data, size)).read_value() == DOCUMENT
+    result = project(JsonStream(chunked(data, size)), paths)
+    assert result == {
+        "task_id": "research-001",
+        "draft": {"outline": ["intro", "body"], "n": 1500.0},
+        "hand_off_to": "Writing Agent",
+    }
+    assert result == select_paths(DOCUMENT, paths)
+
+
+def test_projection_stops_reading_once_keys_are_found():
+    """Test that the rest of the document is never pulled from the stream."""
+    pulled = []
+
+    def chunks():
+        pulled.append(0)
+        yield b'{"task_id": "t1", "hand_off_to": "Writing Agent", '
+        for i in range(1, 100):
+            pulled.append(i)
+            yield b'"filler%d": "%s", ' % (i, b"y" * 1000)
+
+    result = project(JsonStream(chunks()), parse_paths(["hand_off_to", "task_id"]))
+
+    assert result == {"task_id": "t1", "hand_off_to": "Writing Agent"}
+    assert pulled == [0]
+
+
+def test_parse_paths_whole_value_wins():
+    """Test that selecting a whole key overrides selecting parts of it."""
+    assert parse_paths(["a.b", "a", "c.d", "c.e.f"]) == {
+        "a": None,
+        "c": {"d": None, "e": {"f": None}},
+    }
+    assert select_paths({"a": 1, "c": "not an object"}, parse_paths(["a", "c.d"])) == {
+        "a": 1
+    }
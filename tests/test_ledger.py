@@ -0,0 +1,202 @@
+"""
+Unit tests for the Box Agentic Mesh ledger module.
+
+Tests cover appending entries, incremental rollups, merged statistics,
+deduplicated storage of long prompts, and exports.
+Uses mocking to avoid requiring actual Box API calls.
+"""
+
+import json
+from unittest.mock import patch, MagicMock
+from fastapi.testclient import TestClient
+from box_agentic_mesh import blobs
+from box_agentic_mesh.api import app
+from box_agentic_mesh.ledger import log_action, ledger_stats, merge_rollups, read_ledger
+
+
+def make_file(name, content=b""):
+    item = MagicMock()
+    item.name = name
+    item.type = "file"
+    item.content.return_value = content
+    return item
+
+
+@patch("box_agentic_mesh.ledger.get_box_client")
+def test_log_action_updates_rollup(mock_client):
+    """Test that logging counts the entry into the existing rollup.
+
+    Verifies that the function correctly:
+    - Appends the entry to the ledger
+    - Adds the entry to its (hour, action, model) bucket
+    """
+    entry = {
+        "timestamp": "2026-01-14T10:00:00",
+        "action": "research_completed",
+        "model": "GPT-4",
+    }
+    log_file = make_file(".reasoning_ledger.log", (json.dumps(entry) + "\n").encode())
+    rollup_file = make_file(
+        ".reasoning_ledger.rollup.json",
+        json.dumps(
+            {
+                "entries": 1,
+                "bytes": 10,
+                "buckets": {
+                    "2026-01-14T10": {
+                        "research_completed": {
+                            "GPT-4": {
+                                "count": 1,
+                                "bytes": 10,
+                                "prompt_bytes": 0,
+                                "reasoning_bytes": 0,
+                            }
+                        }
+                    }
+                },
+            }
+        ).encode(),
+    )
+    mock_folder = MagicMock()
+    mock_folder.get_items.return_value = [log_file, rollup_file]
+    mock_client.return_value.folder.return_value = mock_folder
+
+    log_action("folder_id", "article_written", model="Claude", reasoning="done")
+
+    stream = rollup_file.update_contents_with_stream.call_args.args[0]
+    rollup = json.loads(stream.getvalue())
+    assert rollup["entries"] == 2
+    hour = next(h for h in rollup["buckets"] if h != "2026-01-14T10")
+    counts = rollup["buckets"][hour]["article_written"]["Claude"]
+    assert counts["count"] == 1
+    assert counts["reasoning_bytes"] == 4
+
+
+@patch("box_agentic_mesh.ledger.get_box_client")
+def test_first_rollup_backfills_history(mock_client):
+    """Test that a ledger without a rollup is backfilled on the next append."""
+    history = "".join(
+        json.dumps({"timestamp": "2026-01-14T10:00:00", "action": "a"}) + "\n"
+        for _ in range(3)
+    )
+    mock_folder = MagicMock()
+    mock_folder.get_items.return_value = [
+        make_file(".reasoning_ledger.log", history.encode())
+    ]
+    mock_client.return_value.folder.return_value = mock_folder
+
+    log_action("folder_id", "a")
+
+    uploads = {
+        call.args[1]: call.args[0].getvalue()
+        for call in mock_folder.upload_stream.call_args_list
+    }
+    rollup = json.loads(uploads[".reasoning_ledger.rollup.json"])
+    assert rollup["entries"] == 4
+
+
+@patch("box_agentic_mesh.ledger.read_rollup")
+def test_ledger_stats_merges_folders(mock_read_rollup):
+    """Test that stats merge folder rollups and honour the hour range."""
+
+    def rollup(hour, action, model, count):
+        counts = {"count": count, "bytes": count * 100}
+        return {
+            "entries": count,
+            "bytes": count * 100,
+            "buckets": {hour: {action: {model: counts}}},
+        }
+
+    rollups = {
+        "f1": rollup("2026-01-14T10", "hand_off", "GPT-4", 2),
+        "f2": rollup("2026-01-14T11", "hand_off", "Claude", 3),
+    }
+    mock_read_rollup.side_effect = lambda folder_id: rollups[folder_id]
+
+    stats = ledger_stats(["f1", "f2"])
+    assert stats["count"] == 5
+    assert stats["by_action"]["hand_off"] == {"count": 5, "bytes": 500}
+    assert stats["by_folder"]["f2"]["count"] == 3
+
+    stats = ledger_stats(["f1", "f2"], since="2026-01-14T11")
+    assert stats["by_model"] == {"Claude": {"count": 3, "bytes": 300}}
+    assert merge_rollups([])["buckets"] == {}
+
+
+@patch("box_agentic_mesh.ledger.LEDGER_BLOB_THRESHOLD", 16)
+@patch("box_agentic_mesh.ledger.get_box_client")
+def test_long_prompts_are_stored_once(mock_client):
+    """Test that repeated long prompts are uploaded once and resolved on read.
+
+    Verifies that the function correctly:
+    - Replaces the prompt with a blob reference in the ledger entry
+    - Skips the blob upload when the same prompt is logged again
+    - Returns the original text from read_ledger
+    """
+    prompt = "You are a careful research assistant. " * 10
+    mock_folder = MagicMock()
+    mock_folder.get_items.return_value = []
+    blob_folder = mock_folder.create_subfolder.return_value
+    blob_folder.upload_stream.side_effect = lambda stream, name: MagicMock(
+        id="blob_file"
+    )
+    mock_client.return_value.folder.side_effect = lambda folder_id: (
+        blob_folder if folder_id == blob_folder.id else mock_folder
+    )
+    mock_client.return_value.file.return_value.content.return_value = prompt.encode()
+
+    log_action("folder_id", "research_completed", prompt=prompt)
+    log_action("folder_id", "research_completed", prompt=prompt)
+
+    assert blob_folder.upload_stream.call_count == 1
+    ledger_upload = next(
+        call.args[0].getvalue()
+        for call in mock_folder.upload_stream.call_args_list
+        if call.args[1] == ".reasoning_ledger.log"
+    )
+    entry = json.loads(ledger_upload)
+    assert entry["prompt"]["size"] == len(prompt)
+
+    mock_folder.get_items.return_value = [
+        make_file(".reasoning_ledger.log", ledger_upload)
+    ]
+    assert read_ledger("folder_id")[0]["prompt"] == prompt
+
+
+@patch("box_agentic_mesh.ledger.get_box_client")
+def test_export_errors_before_streaming(mock_client):
+    """Test that an export that cannot reach Box fails with 500, not 200."""
+    mock_client.side_effect = ValueError("BOX_ACCESS_TOKEN required.")
+
+    response = TestClient(app).get("/ledger/folder_id/export")
+
+    assert response.status_code == 500
+    assert response.json() == {"detail": "BOX_ACCESS_TOKEN required."}
+
+
+@patch("box_agentic_mesh.ledger.get_box_client")
+def test_missing_blobs_are_exported_as_references(mock_client):
+    """Test that a deleted blob neither fails nor truncates ledger reads."""
+    prompt = blobs.blob_ref(b"long prompt")
+    missing = blobs.blob_ref(b"deleted reasoning")
+    lines = [
+        {"action": "a1", "prompt": prompt, "reasoning": missing},
+        {"action": "a2", "prompt": prompt},
+    ]
+    ledger = "".join(json.dumps(line) + "\n" for line in lines).encode("utf-8")
+    mock_folder = MagicMock()
+    mock_folder.get_items.return_value = [make_file(".reasoning_ledger.log", ledger)]
+    mock_client.return_value.folder.return_value = mock_folder
+    blobs._blob_folders["f1"] = "blob_folder"
+    blobs._known_blobs["f1"] = {prompt["$blob"].replace(":", "-"): "prompt_file"}
+    mock_client.return_value.file.return_value.content.return_value = b"long prompt"
+    expected = [
+        {"action": "a1", "prompt": "long prompt", "reasoning": missing},
+        {"action": "a2", "prompt": "long prompt"},
+    ]
+
+    response = TestClient(app).get("/ledger/f1/export")
+    assert response.status_code == 200
+    assert [json.loads(line) for line in response.text.splitlines()] == expected
+    assert TestClient(app).get("/ledger/f1").json() == {"entries": expected}
+    assert mock_client.return_value.file.call_count == 2
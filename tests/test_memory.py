@@ -5,9 +5,13 @@ Tests cover read and write operations for agent memory files.
 Uses mocking to avoid requiring actual Box API calls.
 """
 
+import json
 import pytest
 from unittest.mock import patch, MagicMock
-from box_agentic_mesh.memory import read_memory, write_memory
+from fastapi.testclient import TestClient
+from box_agentic_mesh import blobs
+from box_agentic_mesh.api import app
+from box_agentic_mesh.memory import read_memory, write_memory, flush_memory
 
 
 @patch("box_agentic_mesh.memory.get_box_client")
@@ -43,3 +47,200 @@ def test_write_memory(mock_client):
 
     write_memory("folder_id", {"test": "data"})
     # If no exception is raised, the test passes
+
+
+@patch("box_agentic_mesh.memory.MEMORY_BLOB_THRESHOLD", 16)
+@patch("box_agentic_mesh.memory.get_box_client")
+def test_write_memory_offloads_large_values(mock_client):
+    """Test that large values are stored once as content-addressed blobs.
+
+    Verifies that the function correctly:
+    - Uploads the large value to the blob folder and inlines a reference
+    - Skips the upload when the same value is written again
+    """
+    mock_folder = MagicMock()
+    mock_folder.get_items.return_value = []
+    blob_folder = mock_folder.create_subfolder.return_value
+    mock_client.return_value.folder.side_effect = lambda folder_id: (
+        blob_folder if folder_id == blob_folder.id else mock_folder
+    )
+    data = {"hand_off_to": "Writing Agent", "key_points": ["x" * 100]}
+
+    write_memory("folder_id", data)
+    write_memory("folder_id", data)
+
+    assert blob_folder.upload_stream.call_count == 1
+    uploaded = mock_folder.upload_stream.call_args.args[0].getvalue()
+    document = json.loads(uploaded)
+    assert document["hand_off_to"] == "Writing Agent"
+    assert blobs.is_blob_ref(document["key_points"])
+
+
+@patch("box_agentic_mesh.memory.MEMORY_BLOB_THRESHOLD", 16)
+@patch("box_agentic_mesh.memory.get_box_client")
+def test_missing_blob_is_left_as_reference(mock_client):
+    """Test that one missing blob does not fail the whole read.
+
+    Verifies that the function correctly:
+    - Returns other keys, and the unresolvable reference unchanged
+    - Forgets a cached blob whose file is gone and uploads it again
+    """
+    value = ["x" * 100]
+    ref = blobs.blob_ref(json.dumps(value).encode("utf-8"))
+    lookalike = {"$blob": "sha256:abc", "size": 3}
+    mock_folder = MagicMock()
+    mock_file = MagicMock()
+    mock_file.name = ".agent_memory.json"
+    mock_file.type = "file"
+    mock_file.content.return_value = json.dumps(
+        {"task_id": "t1", "key_points": ref, "x": lookalike}
+    ).encode("utf-8")
+    mock_folder.get_items.return_value = [mock_file]
+    blob_folder = mock_folder.create_subfolder.return_value
+    mock_client.return_value.folder.side_effect = lambda folder_id: (
+        blob_folder if folder_id == blob_folder.id else mock_folder
+    )
+    name = ref["$blob"].replace(":", "-")
+    blobs._blob_folders["folder_id"] = blob_folder.id
+    blobs._known_blobs["folder_id"] = {name: "deleted_id"}
+    not_found = Exception("Not Found")
+    not_found.status = 404
+    mock_client.return_value.file.return_value.content.side_effect = not_found
+
+    result = read_memory("folder_id")
+    assert result == {"task_id": "t1", "key_points": ref, "x": lookalike}
+    assert name not in blobs._known_blobs["folder_id"]
+
+    write_memory("folder_id", {"key_points": value})
+    assert blob_folder.upload_stream.call_args.args[1] == name
+
+
+@patch("box_agentic_mesh.memory.MEMORY_COALESCE_WINDOW", 60)
+@patch("box_agentic_mesh.memory.get_box_client")
+def test_write_memory_coalesces_bursts(mock_client):
+    """Test that a burst of writes to one folder is uploaded once.
+
+    Verifies that the function correctly:
+    - Merges writes per key (or with a merge function) without uploading
+    - Serves the pending memory to readers
+    - Uploads the merged memory once on flush
+    """
+    mock_folder = MagicMock()
+    mock_folder.get_items.return_value = []
+    mock_client.return_value.folder.return_value = mock_folder
+
+    def append_notes(pending, data):
+        notes = pending.get("notes", []) + data.pop("notes", [])
+        return {**pending, **data, "notes": notes}
+
+    write_memory("folder_id", {"task_id": "research-001", "notes": ["a"]})
+    write_memory("folder_id", {"hand_off_to": "Research Agent"})
+    write_memory(
+        "folder_id", {"hand_off_to": "Writing Agent", "notes": ["b"]}, append_notes
+    )
+
+    expected = {
+        "task_id": "research-001",
+        "hand_off_to": "Writing Agent",
+        "notes": ["a", "b"],
+    }
+    assert read_memory("folder_id") == expected
+    mock_folder.upload_stream.assert_not_called()
+
+    assert flush_memory() == 1
+    assert mock_folder.upload_stream.call_count == 1
+    uploaded = mock_folder.upload_stream.call_args.args[0].getvalue()
+    assert json.loads(uploaded) == expected
+    assert flush_memory() == 0
+
+
+def mock_streamed_memory(mock_client, document, blob_payloads=()):
+    """Serve a memory file and its blobs as streamed Box downloads.
+
+    Returns:
+        The downloaded bytes by file ID; the memory file is "memory_id".
+    """
+    mock_folder = MagicMock()
+    mock_file = MagicMock()
+    mock_file.id = "memory_id"
+    mock_file.name = ".agent_memory.json"
+    mock_file.type = "file"
+    mock_folder.get_items.return_value = [mock_file]
+    mock_client.return_value.folder.return_value = mock_folder
+    downloads = {"memory_id": json.dumps(document, indent=2).encode("utf-8")}
+    known = blobs._known_blobs.setdefault("folder_id", {})
+    for number, payload in enumerate(blob_payloads):
+        known[blobs.blob_ref(payload)["$blob"].replace(":", "-")] = f"blob{number}"
+        downloads[f"blob{number}"] = payload
+
+    def download(url, **kwargs):
+        response = MagicMock()
+        response.network_response.response_as_stream.stream.return_value = iter(
+            [downloads[url][:20], downloads[url][20:]]
+        )
+        return response
+
+    mock_client.return_value.file.side_effect = lambda file_id: MagicMock(
+        get_url=lambda endpoint: file_id
+    )
+    mock_client.return_value.session.get.side_effect = download
+    return downloads
+
+
+@patch("box_agentic_mesh.memory.get_box_client")
+def test_read_memory_projects_keys(mock_client):
+    """Test reading selected keys from a streamed memory download.
+
+    Verifies that the function correctly:
+    - Returns only the requested (and nested) keys
+    - Loads the selected part of an offloaded value from its blob
+    - Leaves a reference to a missing blob in place
+    """
+    draft = {"outline": ["intro", "body"], "body": "x" * 100}
+    draft_bytes = json.dumps(draft).encode("utf-8")
+    ref = blobs.blob_ref(draft_bytes)
+    missing = blobs.blob_ref(b"gone")
+    document = {"task_id": "research-001", "draft": ref, "notes": "y" * 100}
+    document["old"] = missing
+    mock_streamed_memory(mock_client, document, [draft_bytes])
+
+    result = read_memory("folder_id", keys=["task_id", "draft.outline"])
+    assert result == {
+        "task_id": "research-001",
+        "draft": {"outline": ["intro", "body"]},
+    }
+    assert read_memory("folder_id", resolve_blobs=False, keys=["draft"]) == {
+        "draft": ref
+    }
+    response = TestClient(app).get("/memory/folder_id", params={"keys": "task_id,old"})
+    assert response.json() == {"memory": {"task_id": "research-001", "old": missing}}
+
+
+@patch("box_agentic_mesh.memory.get_box_client")
+def test_get_memory_streams_blobs(mock_client):
+    """Test streaming a whole memory document through the API.
+
+    Verifies that the endpoint correctly:
+    - Replaces blob references with the blob contents
+    - Leaves a reference to a missing blob in place
+    - Fails with 500 rather than 200 on a truncated document
+    """
+    draft_bytes = json.dumps({"outline": ["intro", "body"]}).encode("utf-8")
+    ref = blobs.blob_ref(draft_bytes)
+    missing = blobs.blob_ref(b"gone")
+    document = {"task_id": "research-001", "draft": ref, "old": missing}
+    downloads = mock_streamed_memory(mock_client, document, [draft_bytes])
+    client = TestClient(app)
+
+    response = client.get("/memory/folder_id")
+    assert response.status_code == 200
+    assert response.json()["memory"] == {
+        "task_id": "research-001",
+        "draft": {"outline": ["intro", "body"]},
+        "old": missing,
+    }
+    response = client.get("/memory/folder_id", params={"resolve_blobs": False})
+    assert response.json()["memory"] == document
+
+    downloads["memory_id"] = downloads["memory_id"][:-10]
+    assert client.get("/memory/folder_id").status_code == 500